@@ -1,6 +1,7 @@
 import streamlit as st
-from openai import OpenAI
 import os
+import time
+import hashlib
 
 # Define a class for an Agent. It's a simple data structure to hold the name, instructions, and model.
 class Agent:
@@ -15,26 +16,71 @@ class Runner:
         self.api_key = api_key
         print("Runner initialized with API key.")
 
-    async def run(self, agent, user_input):
+    async def run(self, agent, user_input, on_progress=None):
+        """
+        Run one agent. With `on_progress`, the reply is streamed and
+        on_progress(chunks) is called as it arrives (about one token per chunk).
+        """
         print(f"--- Running Agent: {agent.name} with model: {agent.model} ---")
         
-        # Make API call using the agent's specified model
+        # Performance record for this call, saved with the run's telemetry
+        telemetry = {
+            'agent': agent.name,
+            'model': agent.model,
+            'prompt_version': hashlib.sha256(agent.instructions.encode('utf-8')).hexdigest()[:12],
+            'retries': 0,
+            'ok': True
+        }
+        started = time.perf_counter()
+        
+        # Make API call using the agent's specified model. The client library is
+        # imported here so that loading the app does not pay for it.
+        from openai import OpenAI
         client = OpenAI(api_key=self.api_key)
+        messages = [
+            {"role": "system", "content": agent.instructions},
+            {"role": "user", "content": user_input}
+        ]
         try:
-            response = client.chat.completions.create(
-                model=agent.model,  # Use agent's specified model
-                messages=[
-                    {"role": "system", "content": agent.instructions},
-                    {"role": "user", "content": user_input}
-                ]
-            )
-            final_output = response.choices[0].message.content
+            if on_progress is None:
+                raw_response = client.chat.completions.with_raw_response.create(
+                    model=agent.model,  # Use agent's specified model
+                    messages=messages
+                )
+                response = raw_response.parse()
+                final_output = response.choices[0].message.content
+                usage = response.usage
+            else:
+                raw_response = client.chat.completions.with_raw_response.create(
+                    model=agent.model,
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+                parts = []
+                usage = None
+                for chunk in raw_response.parse():
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+                        on_progress(len(parts))
+                    if chunk.usage is not None:
+                        usage = chunk.usage  # sent with the last chunk
+                final_output = ''.join(parts)
+            telemetry['retries'] = getattr(raw_response, 'retries_taken', 0)
+            if usage is not None:
+                telemetry['tokens_in'] = usage.prompt_tokens
+                telemetry['tokens_out'] = usage.completion_tokens
+                details = getattr(usage, 'prompt_tokens_details', None)
+                telemetry['cached_tokens'] = getattr(details, 'cached_tokens', None) or 0
         except Exception as e:
             final_output = f"API call failed with {agent.model}: {e}"
+            telemetry['ok'] = False
+        telemetry['seconds'] = time.perf_counter() - started
 
-        return MockResult(final_output)
+        return MockResult(final_output, telemetry)
         
 # A simple class to simulate the result object from an LLM API call.
 class MockResult:
-    def __init__(self, final_output):
-        self.final_output = final_output
\ No newline at end of file
+    def __init__(self, final_output, telemetry=None):
+        self.final_output = final_output
+        self.telemetry = telemetry or {}
\ No newline at end of file
@@ -0,0 +1,110 @@
+import gzip
+import hashlib
+import mmap
+import os
+import tempfile
+import zlib
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:  # optional: fall back to gzip
+    zstandard = None
+
+# Blobs at least this large are decompressed straight from a memory map of the file
+MMAP_THRESHOLD = 1024 * 1024
+
+CODEC_SUFFIXES = ('.zst', '.gz')
+
+
+def content_hash(data: bytes) -> str:
+    """SHA-256 hex digest that names a blob"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _compress(data: bytes) -> tuple:
+    """Compress with zstd when available, else gzip; returns (payload, suffix)"""
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(data), '.zst'
+    return gzip.compress(data, compresslevel=6), '.gz'
+
+
+def _decompress(payload, suffix: str) -> bytes:
+    if suffix == '.zst':
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst artifacts")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    # zlib reads the buffer in place, so a memory map is not copied first
+    return zlib.decompress(payload, wbits=31)
+
+
+class ArtifactStore:
+    """
+    Content-addressed, compressed blob store on disk. Each text is saved once
+    under the SHA-256 of its UTF-8 bytes, so identical documents, drafts and
+    agent outputs share one file however many runs refer to them.
+    """
+
+    def __init__(self, root: str = "components/data/artifacts", mmap_threshold: int = MMAP_THRESHOLD):
+        self.root = root
+        self.mmap_threshold = mmap_threshold
+        os.makedirs(root, exist_ok=True)
+
+    def _base_path(self, digest: str) -> str:
+        # Two-level fan-out keeps directories small
+        return os.path.join(self.root, digest[:2], digest)
+
+    def _find(self, digest: str) -> Optional[str]:
+        base = self._base_path(digest)
+        for suffix in CODEC_SUFFIXES:
+            if os.path.exists(base + suffix):
+                return base + suffix
+        return None
+
+    def exists(self, digest: str) -> bool:
+        """Whether a blob with this hash is stored"""
+        return self._find(digest) is not None
+
+    def put_bytes(self, data: bytes) -> str:
+        """Store a blob unless it is already present and return its hash"""
+        digest = content_hash(data)
+        if self._find(digest) is not None:
+            return digest
+
+        payload, suffix = _compress(data)
+        directory = os.path.dirname(self._base_path(digest))
+        os.makedirs(directory, exist_ok=True)
+        # Write then rename so readers never see a partial blob
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self._base_path(digest) + suffix)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return digest
+
+    def put(self, text: str) -> str:
+        """Store a text and return its hash"""
+        return self.put_bytes(text.encode('utf-8'))
+
+    def get_bytes(self, digest: str) -> bytes:
+        """Read a blob by hash"""
+        path = self._find(digest)
+        if path is None:
+            raise KeyError(f"Artifact not found: {digest}")
+        suffix = os.path.splitext(path)[1]
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size >= self.mmap_threshold:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return _decompress(mapped, suffix)
+            return _decompress(f.read(), suffix)
+
+    def get(self, digest: str) -> str:
+        """Read a text by hash"""
+        return self.get_bytes(digest).decode('utf-8')
@@ -0,0 +1,95 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, List
+
+from components.artifacts import ArtifactStore
+from components.evaluation.batch import evaluate_batch
+from components.evaluation.rules import SCORING_VERSION
+from components.evaluation.runs import RunArchive
+
+
+def _lower_priority():
+    """Run backfill workers below the app's priority so live requests stay responsive"""
+    if hasattr(os, "nice"):
+        os.nice(10)
+
+
+def _score_runs(runs: List[Dict[str, Any]], scoring_version: int, artifact_root: str) -> List[Dict[str, Any]]:
+    """Re-score archived runs, keeping each run's id, timestamp and user"""
+    # Workers read the texts themselves, so only hashes cross the process boundary
+    artifacts = ArtifactStore(artifact_root)
+    # Already in a (niced) pool worker: scan large documents here too rather than
+    # starting a nested pool per worker
+    scores = evaluate_batch(
+        [artifacts.get(run['original_hash']) for run in runs],
+        [artifacts.get(run['analysis_hash']) for run in runs],
+        [artifacts.get(run['final_hash']) for run in runs],
+        large_document_chars=float('inf')
+    )
+    scores['run_id'] = [run['run_id'] for run in runs]
+    scores['timestamp'] = [run['timestamp'] for run in runs]
+    scores['user_id'] = [run['user_id'] for run in runs]
+    scores['scoring_version'] = scoring_version
+    return scores.to_dict('records')
+
+
+def backfill(archive: RunArchive, scoring_version: int = SCORING_VERSION,
+             workers: int = 1, batch_size: int = 50) -> int:
+    """
+    Score every archived run that has no scores for `scoring_version`.
+    Each finished batch is committed on its own, so rerunning after an
+    interruption only scores what is left. Returns the number of runs scored.
+    """
+    total = archive.count_pending(scoring_version)
+    scored = 0
+    after = ''
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_lower_priority) as pool:
+        in_flight = set()
+        exhausted = False
+        while True:
+            # Keep every worker busy with one batch queued behind it
+            while not exhausted and len(in_flight) < workers * 2:
+                runs = archive.pending_runs(scoring_version, after=after, limit=batch_size)
+                if not runs:
+                    exhausted = True
+                    break
+                after = runs[-1]['run_id']
+                in_flight.add(pool.submit(_score_runs, runs, scoring_version, archive.artifacts.root))
+            if not in_flight:
+                break
+
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                scores = future.result()
+                archive.save_scores(scores)
+                scored += len(scores)
+                elapsed = time.perf_counter() - started
+                print(f"Scored {scored}/{total} runs ({scored / elapsed if elapsed else 0:.0f} runs/s)")
+
+    return scored
+
+
+def main(argv: List[str] = None) -> int:
+    """Re-score archived runs under the current scoring version"""
+    parser = argparse.ArgumentParser(description="Re-score archived DocuAlign runs into a versioned score set")
+    parser.add_argument("--db", default="components/data/runs.db", help="Run archive database")
+    parser.add_argument("--artifacts", default="components/data/artifacts", help="Artifact store directory")
+    parser.add_argument("--workers", type=int, default=0, help="Processes to use (0 = all cores)")
+    parser.add_argument("--batch-size", type=int, default=50, help="Runs per task and per commit")
+    args = parser.parse_args(argv)
+
+    archive = RunArchive(args.db, ArtifactStore(args.artifacts))
+    workers = args.workers or os.cpu_count() or 1
+    scored = backfill(archive, SCORING_VERSION, workers=workers, batch_size=args.batch_size)
+    print(f"Backfill complete: {scored} runs scored for version {SCORING_VERSION}")
+    print(archive.versions().to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from components.evaluation.rules import (
+    SCORING_VERSION, TEMPLATE_ELEMENTS, STYLE_VIOLATIONS, GAP_INDICATORS,
+    scan_parsed, scan_budget, identify_gaps, gap_resolution_checks
+)
+from components.evaluation.document import ParsedDocument
+
+# Throughput targets for ~1,000-word guides (original + analysis + final).
+# Scoring is dominated by the rule scans, so with --workers it scales close to
+# linearly with cores (minus pickling the texts to the pool).
+TARGET_DOCS_PER_SECOND_ONE_CORE = 400
+TARGET_DOCS_PER_SECOND_PER_EXTRA_CORE = 350
+
+# Documents longer than this (characters of original + final) are scanned in the process pool
+LARGE_DOCUMENT_CHARS = 200_000
+
+_TEMPLATE_NAMES = list(TEMPLATE_ELEMENTS)
+_VIOLATION_NAMES = list(STYLE_VIOLATIONS)
+_GAP_NAMES = [gap_type for _, gap_type in GAP_INDICATORS]
+
+def _scan_row(row: Sequence[str]) -> tuple:
+    """Scan one (original, analysis, final) triple into flat counts"""
+    original, analysis, final = row
+    # Parsed without the shared caches: batch rows are seen once and should not evict live entries
+    original_document = ParsedDocument(original)
+    final_document = ParsedDocument(final)
+    with scan_budget():
+        original_scan = scan_parsed(original_document, structure=False)
+        final_scan = scan_parsed(final_document)
+    identified = set(identify_gaps(analysis))
+    resolved = gap_resolution_checks(final_scan)
+    return (
+        original_document.word_count,
+        final_document.word_count,
+        [element in final_scan['template_elements'] for element in _TEMPLATE_NAMES],
+        [original_scan['violations'][name] for name in _VIOLATION_NAMES],
+        [final_scan['violations'][name] for name in _VIOLATION_NAMES],
+        [gap_type in identified for gap_type in _GAP_NAMES],
+        [resolved[gap_type] for gap_type in _GAP_NAMES],
+        original_scan['partial'] or final_scan['partial']
+    )
+
+
+def scan_batch(rows: List[Sequence[str]], workers: int = 1,
+               large_document_chars: float = LARGE_DOCUMENT_CHARS) -> List[tuple]:
+    """
+    Scan every row. With one worker, small documents are scanned in-process and
+    only large ones go to a process pool; with more workers everything is spread
+    across the pool. Callers already running in a pool worker pass
+    large_document_chars=float('inf') to keep every scan in-process.
+    """
+    results = [None] * len(rows)
+    if workers > 1:
+        pooled = list(range(len(rows)))
+    else:
+        pooled = [i for i, (original, _, final) in enumerate(rows)
+                  if len(original) + len(final) > large_document_chars]
+        pooled_set = set(pooled)
+        for i, row in enumerate(rows):
+            if i not in pooled_set:
+                results[i] = _scan_row(row)
+
+    if pooled:
+        pool_size = min(workers if workers > 1 else (os.cpu_count() or 1), len(pooled))
+        with ProcessPoolExecutor(max_workers=pool_size) as pool:
+            chunk = max(1, len(pooled) // (pool_size * 4))
+            for i, scanned in zip(pooled, pool.map(_scan_row, [rows[i] for i in pooled], chunksize=chunk)):
+                results[i] = scanned
+    return results
+
+
+def evaluate_batch(originals: Sequence[str], analyses: Sequence[str], finals: Sequence[str],
+                   user_id: str = "batch", workers: int = 1,
+                   large_document_chars: float = LARGE_DOCUMENT_CHARS) -> pd.DataFrame:
+    """
+    Score many documents at once. Returns one row per document with the same
+    columns and values as DocumentEvaluator.score_document.
+    """
+    rows = [(str(o), str(a), str(f)) for o, a, f in zip(originals, analyses, finals)]
+    columns = ['timestamp', 'user_id', 'original_word_count', 'final_word_count', 'processing_successful',
+               'e1_template_compliance_rate', 'e1_template_score', 'e1_template_pass', 'e1_missing_elements',
+               'e2_violation_reduction_rate', 'e2_style_precision', 'e2_style_score', 'e2_style_pass',
+               'e2_remaining_violations', 'h9_gap_resolution_score', 'h9_pass', 'h9_gaps_fixed',
+               'overall_pass', 'overall_score', 'scoring_version', 'scan_partial']
+    if not rows:
+        return pd.DataFrame(columns=columns)
+
+    scanned = scan_batch(rows, workers=workers, large_document_chars=large_document_chars)
+    original_words = np.array([s[0] for s in scanned], dtype=np.int64)
+    final_words = np.array([s[1] for s in scanned], dtype=np.int64)
+    present = np.array([s[2] for s in scanned], dtype=bool)
+    original_violations = np.array([s[3] for s in scanned], dtype=np.int64)
+    final_violations = np.array([s[4] for s in scanned], dtype=np.int64)
+    identified = np.array([s[5] for s in scanned], dtype=bool)
+    resolved = np.array([s[6] for s in scanned], dtype=bool)
+    partial = np.array([s[7] for s in scanned], dtype=bool)
+
+    # E1: Template compliance
+    compliance_rate = present.sum(axis=1) / len(_TEMPLATE_NAMES)
+    template_score = (compliance_rate * 5).astype(np.int64)
+
+    # E2: Style violation reduction (clamped at 0, perfect when nothing to remove)
+    total_original = original_violations.sum(axis=1)
+    total_final = final_violations.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        reduction = np.maximum(0, (total_original - total_final) / total_original)
+    reduction_rate = np.where(total_original > 0, reduction, 1.0)
+    style_score = (reduction_rate * 5).astype(np.int64)
+
+    # H9: Gap resolution
+    total_gaps = identified.sum(axis=1)
+    resolved_gaps = (identified & resolved).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        resolution_rate = resolved_gaps / total_gaps
+    gap_score = np.select(
+        [total_gaps == 0, resolution_rate >= 0.90, resolution_rate >= 0.75, resolution_rate >= 0.60, resolution_rate >= 0.40],
+        [5, 5, 4, 3, 2],
+        default=1
+    )
+
+    template_pass = template_score >= 4
+    style_pass = style_score >= 4
+    gap_pass = gap_score >= 4
+
+    return pd.DataFrame({
+        'timestamp': datetime.now().isoformat(),
+        'user_id': user_id,
+        'original_word_count': original_words,
+        'final_word_count': final_words,
+        'processing_successful': True,
+        'e1_template_compliance_rate': compliance_rate,
+        'e1_template_score': template_score,
+        'e1_template_pass': template_pass,
+        'e1_missing_elements': [
+            json.dumps([name for name, ok in zip(_TEMPLATE_NAMES, row) if not ok]) for row in present
+        ],
+        'e2_violation_reduction_rate': reduction_rate,
+        'e2_style_precision': reduction_rate,
+        'e2_style_score': style_score,
+        'e2_style_pass': style_pass,
+        'e2_remaining_violations': [
+            json.dumps(dict(zip(_VIOLATION_NAMES, map(int, row)))) for row in final_violations
+        ],
+        'h9_gap_resolution_score': gap_score,
+        'h9_pass': gap_pass,
+        'h9_gaps_fixed': "Gap analysis completed",
+        'overall_pass': template_pass & style_pass & gap_pass,
+        'overall_score': (template_score + style_score + gap_score) / 3,
+        'scoring_version': SCORING_VERSION,
+        'scan_partial': partial
+    }, columns=columns)
+
+
+def main(argv: List[str] = None) -> int:
+    """Score a CSV of documents; exit non-zero when the pass rate is below --min-pass-rate"""
+    parser = argparse.ArgumentParser(description="Batch-score documents with the DocuAlign evaluator")
+    parser.add_argument("input", help="CSV with original, analysis and final text columns")
+    parser.add_argument("--output", help="Write per-document scores to this CSV")
+    parser.add_argument("--original-column", default="original")
+    parser.add_argument("--analysis-column", default="analysis")
+    parser.add_argument("--final-column", default="final")
+    parser.add_argument("--workers", type=int, default=1, help="Processes to use (0 = all cores)")
+    parser.add_argument("--min-pass-rate", type=float, help="Fail when the overall pass rate (%%) is lower")
+    args = parser.parse_args(argv)
+
+    workers = args.workers or os.cpu_count() or 1
+    documents = pd.read_csv(args.input, keep_default_na=False)
+
+    started = time.perf_counter()
+    scores = evaluate_batch(
+        documents[args.original_column], documents[args.analysis_column], documents[args.final_column],
+        workers=workers
+    )
+    elapsed = time.perf_counter() - started
+
+    if args.output:
+        scores.to_csv(args.output, index=False)
+
+    pass_rate = scores['overall_pass'].mean() * 100 if len(scores) else 0
+    print(f"Scored {len(scores)} documents in {elapsed:.2f}s "
+          f"({len(scores) / elapsed if elapsed else 0:.0f} docs/s, {workers} worker(s))")
+    print(f"Overall pass rate: {pass_rate:.1f}%  Avg score: {scores['overall_score'].mean() if len(scores) else 0:.2f}/5.0")
+
+    if args.min_pass_rate is not None and pass_rate < args.min_pass_rate:
+        print(f"Pass rate below required {args.min_pass_rate:.1f}%")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
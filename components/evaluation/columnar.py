@@ -0,0 +1,388 @@
+import json
+import os
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only the parquet backend needs it
+    pa = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from components.evaluation.store import (
+    EVALUATION_COLUMNS, BOOLEAN_COLUMNS, EMPTY_SUMMARY, AGGREGATE_METRICS,
+    ROLLUP_METRICS, SKETCH_METRICS, DEFAULT_PERCENTILES, _decode_list_field, _to_db_value, _typed_frame,
+    percentile_frame, rollup_frame
+)
+
+# Bump when a column is added or its type changes. Files record the version they
+# were written with; older files are read through the current schema, with
+# columns they lack coming back as nulls.
+SCHEMA_VERSION = 3
+
+# Partitions holding at least this many files are merged into one after a write
+COMPACT_FILES = 16
+
+
+def _arrow_type(column: str, sql_type: Optional[str]):
+    if column == 'timestamp':
+        return pa.timestamp('us')
+    if column == 'e1_missing_elements':
+        return pa.list_(pa.string())
+    if column == 'e2_remaining_violations':
+        return pa.map_(pa.string(), pa.int64())
+    if column in BOOLEAN_COLUMNS:
+        return pa.bool_()
+    if sql_type == 'INTEGER':
+        return pa.int64()
+    if sql_type == 'REAL':
+        return pa.float64()
+    return pa.string()
+
+
+def arrow_schema():
+    """Current file schema, derived from EVALUATION_COLUMNS"""
+    return pa.schema(
+        [pa.field(column, _arrow_type(column, sql_type)) for column, sql_type in EVALUATION_COLUMNS.items()],
+        metadata={b'docualign.schema_version': str(SCHEMA_VERSION).encode()}
+    )
+
+
+def _arrow_value(column: str, value):
+    """Convert a result value to the Arrow column's Python type"""
+    if column == 'timestamp':
+        timestamp = pd.to_datetime(value, errors='coerce') if value is not None else None
+        return None if timestamp is None or pd.isna(timestamp) else timestamp.to_pydatetime()
+    if column == 'e1_missing_elements':
+        return list(_decode_list_field(value, []))
+    if column == 'e2_remaining_violations':
+        return [(name, int(count)) for name, count in _decode_list_field(value, {}).items()]
+    if hasattr(value, 'item'):
+        value = value.item()  # NumPy scalars
+    value = _to_db_value(column, value)
+    if value is not None and column in BOOLEAN_COLUMNS:
+        return bool(value)
+    return value
+
+
+class ColumnarEvaluationStore:
+    """
+    Evaluation history as day-partitioned Parquet (date=YYYY-MM-DD/part-*.parquet)
+    with typed columns. Queries prune partitions by day and push score and
+    pass-flag filters down to the row groups, reading only the columns needed.
+    """
+
+    def __init__(self, root: str = "components/data/evaluations_parquet",
+                 legacy_db: Optional[str] = "components/data/evaluations.db",
+                 legacy_csv: Optional[str] = "components/data/evaluations.csv"):
+        if pa is None:
+            raise ImportError("The parquet evaluation backend requires pyarrow (pip install pyarrow)")
+        self.root = root
+        self.schema = arrow_schema()
+        os.makedirs(root, exist_ok=True)
+        self._evolve_schema()
+        if not os.path.exists(os.path.join(root, '_imported')):
+            self._import_history(legacy_db, legacy_csv)
+
+    @contextmanager
+    def _lock(self, shared: bool):
+        """Readers share the store lock; compaction takes it exclusively to swap files"""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.root, '_lock'), 'a+') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _evolve_schema(self):
+        """Record the current schema version; older files need no rewrite to be read"""
+        path = os.path.join(self.root, '_schema.json')
+        stored = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                stored = json.load(f)
+        if stored.get('version', 0) > SCHEMA_VERSION:
+            print(f"Evaluation history was written by a newer schema (v{stored['version']}); "
+                  f"reading it as v{SCHEMA_VERSION}")
+            return
+        if stored.get('version') != SCHEMA_VERSION:
+            history = stored.get('history', [])
+            history.append({'version': SCHEMA_VERSION, 'columns': self.schema.names,
+                            'applied': datetime.now().isoformat()})
+            temp_path = path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': SCHEMA_VERSION, 'history': history}, f, indent=2)
+            os.replace(temp_path, path)
+
+    def _import_history(self, legacy_db: Optional[str], legacy_csv: Optional[str]):
+        """Copy existing evaluations from the SQLite store, or else the CSV log, once"""
+        rows = None
+        if legacy_db and os.path.exists(legacy_db):
+            from components.evaluation.store import EvaluationStore
+            sqlite_store = EvaluationStore(legacy_db, legacy_csv)
+            rows = sqlite_store.recent(limit=sqlite_store.summary()['total_evaluations'])
+        elif legacy_csv and os.path.exists(legacy_csv):
+            rows = pd.read_csv(legacy_csv, keep_default_na=False)
+        if rows is not None and not rows.empty:
+            if 'timestamp' in rows.columns:
+                rows['timestamp'] = rows['timestamp'].astype(str)
+            self.save_many(rows.to_dict('records'))
+        open(os.path.join(self.root, '_imported'), 'w').close()
+
+    def _partition_dir(self, day: str) -> str:
+        return os.path.join(self.root, f"date={day}")
+
+    def _days(self) -> List[str]:
+        """Partition days, newest first"""
+        return sorted(
+            (name[len('date='):] for name in os.listdir(self.root) if name.startswith('date=')),
+            reverse=True
+        )
+
+    def _dataset(self, paths: List[str]):
+        """Files read through the current schema, so columns older files lack come back null"""
+        return ds.dataset(paths, schema=self.schema, format='parquet')
+
+    def _partition_files(self, day: str) -> List[str]:
+        directory = self._partition_dir(day)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                      if name.endswith('.parquet') and not name.startswith('.'))
+
+    def _write_file(self, directory: str, table) -> str:
+        """Write a Parquet file under a hidden name, then rename it into view"""
+        os.makedirs(directory, exist_ok=True)
+        name = f"part-{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{uuid.uuid4().hex[:8]}.parquet"
+        temp_path = os.path.join(directory, '.' + name)
+        pq.write_table(table, temp_path)
+        os.replace(temp_path, os.path.join(directory, name))
+        return os.path.join(directory, name)
+
+    def save(self, results: Dict[str, Any]):
+        """Save one evaluation"""
+        self.save_many([results])
+
+    def save_many(self, results: List[Dict[str, Any]]):
+        """Append evaluations as one file per day, skipping runs already stored"""
+        by_day: Dict[str, List[Dict[str, Any]]] = {}
+        for row in results:
+            timestamp = _arrow_value('timestamp', row.get('timestamp')) or datetime.now()
+            by_day.setdefault(timestamp.strftime('%Y-%m-%d'), []).append(row)
+
+        for day, rows in by_day.items():
+            run_ids = [row.get('run_id') for row in rows if row.get('run_id')]
+            if run_ids:
+                with self._lock(shared=True):
+                    files = self._partition_files(day)
+                    stored = set(
+                        self._dataset(files).to_table(
+                            columns=['run_id'], filter=ds.field('run_id').isin(run_ids)
+                        ).column('run_id').to_pylist()
+                    ) if files else set()
+                rows = [row for row in rows if not row.get('run_id') or row['run_id'] not in stored]
+            if not rows:
+                continue
+            table = pa.Table.from_pylist(
+                [{column: _arrow_value(column, row.get(column)) for column in self.schema.names} for row in rows],
+                schema=self.schema
+            )
+            self._write_file(self._partition_dir(day), table)
+            if len(self._partition_files(day)) >= COMPACT_FILES:
+                self.compact(day)
+
+    def compact(self, day: str):
+        """Merge a day's files into one; readers never see both the merged file and its sources"""
+        sources = self._partition_files(day)
+        if len(sources) < 2:
+            return
+        merged = self._dataset(sources).to_table().sort_by('timestamp')
+        directory = self._partition_dir(day)
+        name = f"part-{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{uuid.uuid4().hex[:8]}.parquet"
+        temp_path = os.path.join(directory, '.' + name)
+        pq.write_table(merged, temp_path)
+        with self._lock(shared=False):
+            if not all(os.path.exists(path) for path in sources):
+                os.remove(temp_path)  # another process compacted these first
+                return
+            os.replace(temp_path, os.path.join(directory, name))
+            for path in sources:
+                os.remove(path)
+
+    def _read(self, columns: List[str], filter_expression=None, days: Optional[List[str]] = None,
+              limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Read the newest matching rows from the given day partitions (newest first),
+        stopping once `limit` rows are found. Returned oldest first.
+        """
+        tables = []
+        found = 0
+        with self._lock(shared=True):
+            for day in (days if days is not None else self._days()):
+                files = self._partition_files(day)
+                if not files:
+                    continue
+                table = self._dataset(files).to_table(columns=columns, filter=filter_expression)
+                if table.num_rows:
+                    tables.append(table)
+                    found += table.num_rows
+                if limit is not None and found >= limit:
+                    break
+        if not tables:
+            return pd.DataFrame(columns=columns)
+
+        table = pa.concat_tables(tables)
+        if 'timestamp' in columns:
+            # run_id breaks ties so keyset pages split equal timestamps consistently
+            table = table.sort_by([('timestamp', 'descending')] + (
+                [('run_id', 'descending')] if 'run_id' in columns else []
+            ))
+        if limit is not None:
+            table = table.slice(0, limit)
+        df = table.to_pandas().iloc[::-1].reset_index(drop=True)
+        if 'e1_missing_elements' in df.columns:
+            df['e1_missing_elements'] = [list(value) if value is not None else [] for value in df['e1_missing_elements']]
+        if 'e2_remaining_violations' in df.columns:
+            df['e2_remaining_violations'] = [dict(value) if value is not None else {} for value in df['e2_remaining_violations']]
+        return _typed_frame(df)
+
+    def recent(self, limit: int = 10) -> pd.DataFrame:
+        """Get the most recent evaluations, oldest first, reading only the newest partitions"""
+        return self._read(self.schema.names, limit=limit)
+
+    def _filter(self, show: str, days: Optional[int], min_score: Optional[float]) -> tuple:
+        """(pushdown filter expression, partition days to read) for the dashboard filters"""
+        conditions = []
+        flag = {'failed': 'overall_pass', 'template': 'e1_template_pass', 'style': 'e2_style_pass'}.get(show)
+        if flag:
+            conditions.append(ds.field(flag) == False)
+        if min_score is not None:
+            conditions.append(ds.field('overall_score') >= min_score)
+        partitions = self._days()
+        if days is not None:
+            cutoff = datetime.now() - timedelta(days=days)
+            partitions = [day for day in partitions if day >= cutoff.strftime('%Y-%m-%d')]
+            conditions.append(ds.field('timestamp') >= pa.scalar(cutoff, type=pa.timestamp('us')))
+
+        filter_expression = None
+        for condition in conditions:
+            filter_expression = condition if filter_expression is None else filter_expression & condition
+        return filter_expression, partitions
+
+    def query(self, show: str = 'all', days: Optional[int] = None,
+              min_score: Optional[float] = None, limit: int = 20) -> pd.DataFrame:
+        """Filter with partition pruning and predicate pushdown and return the newest matching rows"""
+        filter_expression, partitions = self._filter(show, days, min_score)
+        return self._read(self.schema.names, filter_expression, days=partitions, limit=limit)
+
+    def page(self, show: str = 'all', days: Optional[int] = None, min_score: Optional[float] = None,
+             page_size: int = 50, cursor: Optional[tuple] = None) -> Dict[str, Any]:
+        """
+        One page of matching evaluations, newest first, plus the total match count.
+        `cursor` is the previous page's next_cursor, the (timestamp, run_id) of its
+        last row. It is pushed down as a filter and prunes newer partitions, so a
+        deep page reads no more than the first one, and rows saved meanwhile do not
+        shift later pages. The count comes from file statistics when no filter applies.
+        """
+        filter_expression, partitions = self._filter(show, days, min_score)
+        with self._lock(shared=True):
+            files = [path for day in partitions for path in self._partition_files(day)]
+            total = self._dataset(files).count_rows(filter=filter_expression) if files else 0
+        if cursor is not None:
+            timestamp, run_id = cursor
+            partitions = [day for day in partitions if day <= timestamp.strftime('%Y-%m-%d')]
+            at = pa.scalar(timestamp, type=pa.timestamp('us'))
+            # Rows without a run_id sort as '' (they are last among equal timestamps)
+            after = (ds.field('timestamp') < at) | (
+                (ds.field('timestamp') == at) & (pc.coalesce(ds.field('run_id'), '') < run_id)
+            )
+            filter_expression = after if filter_expression is None else filter_expression & after
+        rows = self._read(self.schema.names, filter_expression, days=partitions, limit=page_size + 1)
+        rows = rows.iloc[::-1].reset_index(drop=True)
+        next_cursor = None
+        if len(rows) > page_size:
+            last = rows.iloc[page_size - 1]
+            next_cursor = (last['timestamp'].to_pydatetime(), last['run_id'] if isinstance(last['run_id'], str) else '')
+        return {'rows': rows.iloc[:page_size], 'total': total, 'next_cursor': next_cursor}
+
+    def rollups(self, granularity: str = 'day', since: Optional[datetime] = None) -> pd.DataFrame:
+        """Trend buckets from only the timestamp and metric columns of the partitions after `since`"""
+        columns = ['timestamp'] + list(ROLLUP_METRICS) + list(ROLLUP_METRICS.values())
+        partitions = self._days()
+        filter_expression = None
+        if since is not None:
+            partitions = [day for day in partitions if day >= since.strftime('%Y-%m-%d')]
+            filter_expression = ds.field('timestamp') >= pa.scalar(since, type=pa.timestamp('us'))
+        return rollup_frame(self._read(columns, filter_expression, days=partitions), granularity)
+
+    def percentiles(self, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                    percentiles=DEFAULT_PERCENTILES) -> pd.DataFrame:
+        """Exact percentiles from only the timestamp and metric columns of the partitions in the window"""
+        columns = ['timestamp', 'original_word_count', 'final_word_count'] + [
+            metric for metric in SKETCH_METRICS if metric in EVALUATION_COLUMNS
+        ]
+        partitions = self._days()
+        conditions = []
+        if since is not None:
+            partitions = [day for day in partitions if day >= since.strftime('%Y-%m-%d')]
+            conditions.append(ds.field('timestamp') >= pa.scalar(since, type=pa.timestamp('us')))
+        if until is not None:
+            partitions = [day for day in partitions if day <= until.strftime('%Y-%m-%d')]
+            conditions.append(ds.field('timestamp') <= pa.scalar(until, type=pa.timestamp('us')))
+        filter_expression = None
+        for condition in conditions:
+            filter_expression = condition if filter_expression is None else filter_expression & condition
+        return percentile_frame(self._read(columns, filter_expression, days=partitions), percentiles)
+
+    def version(self) -> tuple:
+        """Modification time of every partition directory; files are only ever renamed in or removed"""
+        return tuple(
+            (day, os.stat(self._partition_dir(day)).st_mtime_ns) for day in self._days()
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        """Summary statistics computed over only the metric columns"""
+        columns = sorted({column for column, _ in AGGREGATE_METRICS.values()})
+        with self._lock(shared=True):
+            files = [path for day in self._days() for path in self._partition_files(day)]
+            if not files:
+                return dict(EMPTY_SUMMARY)
+            table = self._dataset(files).to_table(columns=columns + ['e1_missing_elements', 'e2_remaining_violations'])
+
+        summary = dict(EMPTY_SUMMARY)
+        summary['total_evaluations'] = table.num_rows
+        for key, (column, scale) in AGGREGATE_METRICS.items():
+            values = table.column(column)
+            if values.type == pa.bool_():
+                values = pc.cast(values, pa.int64())
+            mean = pc.mean(values).as_py()
+            if mean is not None:
+                summary[key] = mean * scale
+
+        missing = pc.value_counts(pc.list_flatten(table.column('e1_missing_elements'))).to_pylist()
+        summary['missing_element_counts'] = dict(sorted(
+            ((entry['values'], entry['counts']) for entry in missing), key=lambda item: -item[1]
+        ))
+        violations = table.column('e2_remaining_violations').combine_chunks()
+        totals = pa.table({'violation_type': violations.keys, 'total': violations.items}).group_by(
+            'violation_type'
+        ).aggregate([('total', 'sum')])
+        summary['violation_totals'] = dict(sorted(
+            zip(totals.column('violation_type').to_pylist(), totals.column('total_sum').to_pylist()),
+            key=lambda item: -item[1]
+        ))
+        return summary
@@ -2,38 +2,91 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import numpy as np
 from datetime import datetime, timedelta
 import json
-from components.evaluation.evaluator import DocumentEvaluator
+import os
+from components.evaluation.dashboard_data import get_dashboard_data
+from components.evaluation.downsample import lttb_indices
+from components.evaluation.telemetry import (
+    PHASES, TelemetryStore, phase_latencies, agent_usage, telemetry_trend
+)
 
-def show_evaluation_dashboard():
-    """Display the enhanced evaluation dashboard with template compliance and style precision"""
-    
-    st.title("📊 DocuAlign evaluation dashboard")
-    st.markdown("Template compliance and style violation precision/recall tracking")
-    
-    # Initialize evaluator
-    evaluator = DocumentEvaluator()
-    
-    # Get evaluation data
-    summary = evaluator.get_evaluation_summary()
-    recent_evaluations = evaluator.get_recent_evaluations(20)
-    
-    if summary['total_evaluations'] == 0:
-        st.info("🔄 No evaluation data available yet. Process some documents first!")
-        return
-    
-    # Check if we have the expected columns (updated for new schema)
-    expected_columns = ['e1_template_pass', 'e2_style_pass', 'h9_pass', 'e1_template_score', 'e2_style_score', 'h9_gap_resolution_score']
-    missing_columns = [col for col in expected_columns if col not in recent_evaluations.columns]
+# Seconds between refreshes of each dashboard section (0 turns live updates off).
+# A refresh only checks the store's version and reads rows saved since the last one.
+DASHBOARD_REFRESH_SECONDS = float(os.getenv("DOCUALIGN_DASHBOARD_REFRESH", 10)) or None
+
+# Trend series longer than this are downsampled with LTTB before they are sent
+TREND_MAX_POINTS = 1000
+# Series with more points than this are drawn with WebGL instead of SVG
+WEBGL_MIN_POINTS = 300
+
+# Distribution panel rows: sketched metric -> label
+PERCENTILE_LABELS = {
+    'overall_score': 'Overall score',
+    'word_count_delta': 'Word count change',
+    'analysis_seconds': 'Analysis phase (s)',
+    'style_seconds': 'Style phase (s)',
+    'scoring_seconds': 'Scoring (s)'
+}
+
+# "Rows per page" choices for the filtered evaluations table
+PAGE_SIZES = [25, 100, 1000, 10000]
+
+EVALUATIONS_TABLE_CONFIG = {
+    'Date': st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm"),
+    'Quality Score': st.column_config.NumberColumn(format="%.1f/5.0"),
+    'Original Words': st.column_config.NumberColumn(format="%d"),
+    'Final Words': st.column_config.NumberColumn(format="%d")
+}
+
+
+def _status_column(scores: pd.Series, passed: pd.Series) -> pd.Categorical:
+    """
+    '✅ PASS (score)' / '❌ FAIL (score)' for every row at once. Rows are coded
+    as score * 2 + passed (-1 when unscored), so only the few distinct labels
+    are formatted as strings.
+    """
+    values = scores.to_numpy(dtype=float, na_value=np.nan)
+    unscored = np.isnan(values)
+    keys = np.where(unscored, -1, np.nan_to_num(values).round().astype(np.int64) * 2 + passed.to_numpy(dtype=bool))
+    unique_keys, codes = np.unique(keys, return_inverse=True)
+    labels = [
+        "❓ UNKNOWN" if key < 0 else f"{'✅ PASS' if key % 2 else '❌ FAIL'} ({key // 2})"
+        for key in unique_keys
+    ]
+    return pd.Categorical.from_codes(codes, labels)
+
+
+def build_evaluations_table(evaluations: pd.DataFrame) -> pd.DataFrame:
+    """Presentation frame for the evaluations table, built with vectorized column expressions"""
+    return pd.DataFrame({
+        'Date': evaluations['timestamp'],
+        'E1 Template Status': _status_column(evaluations['e1_template_score'], evaluations['e1_template_pass']),
+        'E2 Style Status': _status_column(evaluations['e2_style_score'], evaluations['e2_style_pass']),
+        'H9 Gap Status': _status_column(evaluations['h9_gap_resolution_score'], evaluations['h9_pass']),
+        'Overall': pd.Categorical(np.where(evaluations['overall_pass'].to_numpy(dtype=bool), "✅ PASS", "❌ FAIL")),
+        'Quality Score': evaluations['overall_score'],
+        'Original Words': evaluations['original_word_count'],
+        'Final Words': evaluations['final_word_count']
+    })
+
+
+@st.fragment(run_every=DASHBOARD_REFRESH_SECONDS)
+def _wait_for_evaluations():
+    """Empty-state message that reloads the whole dashboard once the first evaluation is saved"""
+    if get_dashboard_data().snapshot().summary['total_evaluations'] > 0:
+        st.rerun()
+    st.info("🔄 No evaluation data available yet. Process some documents first!")
+
+
+@st.fragment(run_every=DASHBOARD_REFRESH_SECONDS)
+def _render_summary():
+    """Failure alert and key metrics, refreshed from the shared snapshot"""
     
-    if missing_columns:
-        st.error(f"⚠️ **Data Schema Issue**: Missing columns {missing_columns}. Please delete the old evaluation data and process a new document.")
-        st.info("Run this command to reset: `rm components/data/evaluations.csv`")
-        
-        # Show available columns for debugging
-        st.write("**Available columns:**", list(recent_evaluations.columns))
-        return
+    snapshot = get_dashboard_data().snapshot()
+    summary = snapshot.summary
+    recent_evaluations = snapshot.recent(20)
     
     # Alert for critical issues
     if not recent_evaluations.empty:
@@ -98,50 +151,64 @@ def show_evaluation_dashboard():
             f"{avg_score:.1f}/5.0",
             delta=f"{avg_score - 4.0:.1f}" if avg_score > 0 else None
         )
+
+
+@st.fragment(run_every=DASHBOARD_REFRESH_SECONDS)
+def _render_quality_trends():
+    """Quality trend chart; rollups are read again only for buckets that received new rows"""
+    
+    snapshot = get_dashboard_data().snapshot()
+    
+    # Enhanced Quality Trends Chart (from time-bucketed rollups over the full history)
+    st.markdown("## 📊 Quality Trends")
     
-    # Enhanced Quality Trends Chart
-    if not recent_evaluations.empty and len(recent_evaluations) >= 3:
-        st.markdown("## 📊 Quality Trends")
+    trend_days = st.selectbox(
+        "Trend Period:",
+        [1, 7, 30, 90, 365, None],
+        index=2,
+        format_func=lambda x: "All time" if x is None else ("Last 24 hours" if x == 1 else f"Last {x} days")
+    )
+    
+    try:
+        bucket_size, trend = snapshot.trend(trend_days)
         
-        try:
-            # Convert timestamp to datetime if it's not already
-            recent_evaluations['timestamp'] = pd.to_datetime(recent_evaluations['timestamp'])
-            
-            # Create trend chart with new metrics
+        if trend.empty:
+            st.info("No evaluations in this period yet.")
+        else:
             fig = go.Figure()
             
-            fig.add_trace(go.Scatter(
-                x=recent_evaluations['timestamp'],
-                y=recent_evaluations['e1_template_score'],
-                mode='lines+markers',
-                name='Template Compliance (E1)',
-                line=dict(color='#10b981'),
-                marker=dict(size=6),
-                hovertemplate='<b>Template Compliance (E1)</b><br>Date: %{x}<br>Score: %{y}/5<extra></extra>'
-            ))
-            
-            fig.add_trace(go.Scatter(
-                x=recent_evaluations['timestamp'],
-                y=recent_evaluations['e2_style_score'],
-                mode='lines+markers',
-                name='Style Violation Reduction (E2)',
-                line=dict(color='#3b82f6'),
-                marker=dict(size=6),
-                hovertemplate='<b>Style Violation Reduction (E2)</b><br>Date: %{x}<br>Score: %{y}/5<extra></extra>'
-            ))
+            trend_metrics = [
+                ('e1_template_score', 'Template Compliance (E1)', '#10b981'),
+                ('e2_style_score', 'Style Violation Reduction (E2)', '#3b82f6'),
+                ('h9_gap_resolution_score', 'Gap Resolution (H9)', '#f59e0b')
+            ]
             
-            fig.add_trace(go.Scatter(
-                x=recent_evaluations['timestamp'],
-                y=recent_evaluations['h9_gap_resolution_score'],
-                mode='lines+markers',
-                name='Gap Resolution (H9)',
-                line=dict(color='#f59e0b'),
-                marker=dict(size=6),
-                hovertemplate='<b>Gap Resolution (H9)</b><br>Date: %{x}<br>Score: %{y}/5<extra></extra>'
-            ))
+            for metric, label, color in trend_metrics:
+                series = trend[trend['metric'] == metric]
+                if len(series) > TREND_MAX_POINTS:
+                    series = series.iloc[lttb_indices(
+                        series['bucket'].to_numpy(dtype='datetime64[ns]').astype(np.int64),
+                        series['mean'].to_numpy(dtype=float),
+                        TREND_MAX_POINTS
+                    )]
+                trace = go.Scattergl if len(series) > WEBGL_MIN_POINTS else go.Scatter
+                fig.add_trace(trace(
+                    x=series['bucket'],
+                    y=series['mean'],
+                    customdata=series[['min', 'max', 'pass_rate', 'count']].to_numpy(),
+                    mode='lines+markers',
+                    name=label,
+                    line=dict(color=color),
+                    marker=dict(size=6),
+                    hovertemplate=(
+                        f'<b>{label}</b><br>{bucket_size.title()}: %{{x}}<br>Mean: %{{y:.2f}}/5 '
+                        '(min %{customdata[0]}, max %{customdata[1]})<br>'
+                        'Pass rate: %{customdata[2]:.1f}%<br>Documents: %{customdata[3]}<extra></extra>'
+                    )
+                ))
             
             fig.update_layout(
-                title="Enhanced Evaluation Scores Over Time",
+                title=f"Enhanced Evaluation Scores Over Time (per {bucket_size})",
                 xaxis_title="Date",
                 yaxis_title="Score (1-5)",
                 yaxis=dict(range=[0, 5]),
@@ -150,10 +217,47 @@ def show_evaluation_dashboard():
             )
             
             st.plotly_chart(fig, use_container_width=True)
-            
-        except Exception as e:
-            st.error(f"Error creating trend chart: {e}")
-            st.info("Try processing a few more documents to see trends.")
+        
+    except Exception as e:
+        st.error(f"Error creating trend chart: {e}")
+        st.info("Try processing a few more documents to see trends.")
+    
+    _render_percentiles(snapshot, trend_days)
+
+
+def _render_percentiles(snapshot, days):
+    """p50/p90/p99 of score, word-count change and phase latencies over the trend period"""
+    
+    st.markdown("### 📐 Distributions")
+    try:
+        percentiles = snapshot.percentiles(days)
+        percentiles = percentiles[percentiles['count'] > 0]
+        if percentiles.empty:
+            st.info("No evaluations in this period yet.")
+            return
+        
+        table = pd.DataFrame({
+            'Metric': percentiles['metric'].map(PERCENTILE_LABELS),
+            'Documents': percentiles['count'],
+            'p50': percentiles['p50'],
+            'p90': percentiles['p90'],
+            'p99': percentiles['p99'],
+            'Max': percentiles['max']
+        })
+        st.dataframe(table, use_container_width=True, hide_index=True, column_config={
+            column: st.column_config.NumberColumn(format="%.3f") for column in ['p50', 'p90', 'p99', 'Max']
+        })
+        st.caption("With SQLite, percentiles are merged from quantile sketches kept per hour and day and are accurate to about 1% of rank.")
+        
+    except Exception as e:
+        st.error(f"Error loading distributions: {e}")
+
+
+@st.fragment(run_every=DASHBOARD_REFRESH_SECONDS)
+def _render_latest_evaluation():
+    """Template and style details of the newest evaluation"""
+    
+    recent_evaluations = get_dashboard_data().snapshot().recent(1)
     
     # Template Compliance Details
     if not recent_evaluations.empty:
@@ -216,11 +320,19 @@ def show_evaluation_dashboard():
         
         except Exception as e:
             st.error(f"Error displaying template compliance details: {e}")
+
+
+@st.fragment(run_every=DASHBOARD_REFRESH_SECONDS)
+def _render_evaluations_table():
+    """Filters, one page of matching evaluations and the pager"""
+    
+    snapshot = get_dashboard_data().snapshot()
+    recent_evaluations = snapshot.recent(20)
     
     # Filters (updated for new schema)
     st.markdown("## 🔍 Filter Options")
     
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         show_filter = st.selectbox(
@@ -242,30 +354,42 @@ def show_evaluation_dashboard():
             index=0
         )
     
-    # Apply filters (updated for new schema)
-    filtered_data = recent_evaluations.copy()
+    with col4:
+        page_size = st.selectbox(
+            "Rows per page:",
+            PAGE_SIZES,
+            index=0
+        )
+    
+    # Apply filters in the evaluation store (updated for new schema)
+    show_keys = {
+        "All Evaluations": "all",
+        "Failed Evaluations": "failed",
+        "Template Issues": "template",
+        "Style Issues": "style"
+    }
+    
+    # Page through every match; the cursor stack goes back to page 1 when a filter or the page size changes
+    filters = (show_keys[show_filter], days_filter, score_filter, page_size)
+    if st.session_state.get("evaluation_page_filters") != filters:
+        st.session_state["evaluation_page_filters"] = filters
+        st.session_state["evaluation_page_cursors"] = [None]
+    page_cursors = st.session_state["evaluation_page_cursors"]
     
     try:
-        if show_filter == "Failed Evaluations":
-            filtered_data = filtered_data[filtered_data['overall_pass'] == False]
-        elif show_filter == "Template Issues":
-            filtered_data = filtered_data[filtered_data['e1_template_pass'] == False]
-        elif show_filter == "Style Issues":
-            filtered_data = filtered_data[filtered_data['e2_style_pass'] == False]
-        
-        if not filtered_data.empty:
-            # Filter by score
-            if 'overall_score' in filtered_data.columns:
-                filtered_data = filtered_data[filtered_data['overall_score'] >= score_filter]
-            
-            # Filter by date
-            cutoff_date = datetime.now() - timedelta(days=days_filter)
-            filtered_data['timestamp'] = pd.to_datetime(filtered_data['timestamp'])
-            filtered_data = filtered_data[filtered_data['timestamp'] >= cutoff_date]
+        page = snapshot.page(
+            show=filters[0],
+            days=filters[1],
+            min_score=filters[2],
+            page_size=page_size,
+            cursor=page_cursors[-1]
+        )
+        filtered_data = page['rows']
         
     except Exception as e:
         st.error(f"Error applying filters: {e}")
-        filtered_data = recent_evaluations.copy()
+        page = {'rows': recent_evaluations, 'total': len(recent_evaluations), 'next_cursor': None}
+        filtered_data = recent_evaluations
     
     # Enhanced Evaluations Table
     st.markdown("## 📋 Recent Evaluations")
@@ -274,81 +398,13 @@ def show_evaluation_dashboard():
         st.info("No evaluations match your filter criteria.")
     else:
         try:
-            # Prepare display data (updated for new schema)
-            display_data = filtered_data.copy()
-            display_data['Date'] = display_data['timestamp'].dt.strftime('%Y-%m-%d %H:%M')
-            
-            # Create status indicators for new metrics
-            def safe_create_status_indicator(score, passed):
-                try:
-                    if passed:
-                        return f"✅ PASS ({score})"
-                    else:
-                        return f"❌ FAIL ({score})"
-                except:
-                    return "❓ UNKNOWN"
-            
-            # Create status columns for new evaluation criteria
-            if all(col in display_data.columns for col in ['e1_template_score', 'e1_template_pass']):
-                display_data['E1 Template Status'] = display_data.apply(
-                    lambda row: safe_create_status_indicator(row['e1_template_score'], row['e1_template_pass']), axis=1
-                )
-            else:
-                display_data['E1 Template Status'] = "❓ N/A"
-                
-            if all(col in display_data.columns for col in ['e2_style_score', 'e2_style_pass']):
-                display_data['E2 Style Status'] = display_data.apply(
-                    lambda row: safe_create_status_indicator(row['e2_style_score'], row['e2_style_pass']), axis=1
-                )
-            else:
-                display_data['E2 Style Status'] = "❓ N/A"
-                
-            if all(col in display_data.columns for col in ['h9_gap_resolution_score', 'h9_pass']):
-                display_data['H9 Gap Status'] = display_data.apply(
-                    lambda row: safe_create_status_indicator(row['h9_gap_resolution_score'], row['h9_pass']), axis=1
-                )
-            else:
-                display_data['H9 Gap Status'] = "❓ N/A"
-                
-            if 'overall_pass' in display_data.columns:
-                display_data['Overall'] = display_data['overall_pass'].apply(
-                    lambda x: "✅ PASS" if x else "❌ FAIL"
-                )
-            else:
-                display_data['Overall'] = "❓ N/A"
-                
-            if 'overall_score' in display_data.columns:
-                display_data['Quality Score'] = display_data['overall_score'].apply(
-                    lambda x: f"{x:.1f}/5.0"
-                )
-            else:
-                display_data['Quality Score'] = "❓ N/A"
-            
-            # Select columns to display (updated for new schema)
-            base_columns = ['Date', 'E1 Template Status', 'E2 Style Status', 'H9 Gap Status', 'Overall', 'Quality Score']
-            
-            # Add word counts if available
-            if 'original_word_count' in display_data.columns:
-                base_columns.append('original_word_count')
-            if 'final_word_count' in display_data.columns:
-                base_columns.append('final_word_count')
-            
-            # Filter to only existing columns
-            columns_to_show = [col for col in base_columns if col in display_data.columns]
-            
-            # Rename columns for display
-            column_mapping = {
-                'original_word_count': 'Original Words',
-                'final_word_count': 'Final Words'
-            }
-            
-            display_df = display_data[columns_to_show].rename(columns=column_mapping)
-            
-            # Display table
+            # One presentation frame built column by column; scores and dates
+            # are formatted by the grid, which only renders the visible rows
             st.dataframe(
-                display_df,
+                build_evaluations_table(filtered_data),
                 use_container_width=True,
-                hide_index=True
+                hide_index=True,
+                column_config=EVALUATIONS_TABLE_CONFIG
             )
             
         except Exception as e:
@@ -357,6 +413,64 @@ def show_evaluation_dashboard():
             st.write("**Sample data:**")
             st.write(filtered_data.head(2))
     
+    if page['total'] > 0:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        
+        with col1:
+            st.button(
+                "← Newer",
+                disabled=len(page_cursors) == 1,
+                on_click=page_cursors.pop,
+                use_container_width=True
+            )
+        
+        with col2:
+            total_pages = max(1, -(-page['total'] // page_size))
+            st.caption(f"Page {len(page_cursors)} of {total_pages:,} · {page['total']:,} matching evaluations")
+        
+        with col3:
+            st.button(
+                "Older →",
+                disabled=page['next_cursor'] is None,
+                on_click=page_cursors.append,
+                args=(page['next_cursor'],),
+                use_container_width=True
+            )
+
+
+def show_evaluation_dashboard():
+    """Display the enhanced evaluation dashboard with template compliance and style precision"""
+    
+    st.title("📊 DocuAlign evaluation dashboard")
+    st.markdown("Template compliance and style violation precision/recall tracking")
+    
+    # Get evaluation data from the shared snapshot (reloaded only when the store changes)
+    snapshot = get_dashboard_data().snapshot()
+    summary = snapshot.summary
+    recent_evaluations = snapshot.recent(20)
+    
+    if summary['total_evaluations'] == 0:
+        _wait_for_evaluations()
+        return
+    
+    # Check if we have the expected columns (updated for new schema)
+    expected_columns = ['e1_template_pass', 'e2_style_pass', 'h9_pass', 'e1_template_score', 'e2_style_score', 'h9_gap_resolution_score']
+    missing_columns = [col for col in expected_columns if col not in recent_evaluations.columns]
+    
+    if missing_columns:
+        # Stores fill columns older rows lack, so this only happens when loading failed
+        st.error(f"⚠️ **Data Schema Issue**: Missing columns {missing_columns}. Evaluation history could not be loaded.")
+        
+        # Show available columns for debugging
+        st.write("**Available columns:**", list(recent_evaluations.columns))
+        return
+    
+    # Each section is a fragment that refreshes on its own every DASHBOARD_REFRESH_SECONDS
+    _render_summary()
+    _render_quality_trends()
+    _render_latest_evaluation()
+    _render_evaluations_table()
+    
     # Enhanced Export functionality
     st.markdown("## 📊 Export Data")
     
@@ -410,13 +524,13 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                 mime="text/markdown"
             )
 
+
 def show_evaluation_insights():
     """Show enhanced evaluation insights and recommendations"""
     
     st.markdown("## 💡 Enhanced Quality Insights")
     
-    evaluator = DocumentEvaluator()
-    summary = evaluator.get_evaluation_summary()
+    summary = get_dashboard_data().snapshot().summary
     
     if summary['total_evaluations'] == 0:
         st.info("Process some documents first to see insights!")
@@ -510,14 +624,120 @@ def show_evaluation_insights():
     for rec in recommendations:
         st.write(f"• {rec}")
 
+@st.cache_data(max_entries=16, show_spinner=False)
+def _telemetry_records(days, version, minute) -> pd.DataFrame:
+    """Telemetry records for a period, cached per store version (and minute, as the window moves)"""
+    since = datetime.now() - timedelta(days=days) if days is not None else None
+    return TelemetryStore().records(since)
+
+
+@st.fragment(run_every=DASHBOARD_REFRESH_SECONDS)
+def show_performance_telemetry():
+    """Per-phase latency, token usage, prompt cache hits, retries, queue wait and throughput"""
+    
+    st.markdown("## ⏱️ Pipeline Performance")
+    
+    telemetry_days = st.selectbox(
+        "Period:",
+        [1, 7, 30, None],
+        index=1,
+        format_func=lambda x: "All time" if x is None else ("Last 24 hours" if x == 1 else f"Last {x} days"),
+        key="telemetry_days"
+    )
+    
+    try:
+        records = _telemetry_records(telemetry_days, TelemetryStore().version(), int(datetime.now().timestamp() // 60))
+    except Exception as e:
+        st.error(f"Error loading telemetry: {e}")
+        return
+    
+    if records.empty:
+        st.info("No runs recorded in this period yet. Process a document to see pipeline performance.")
+        return
+    
+    runs = records[records['phase'] == 'evaluation']
+    calls = records[records['agent'].notna()]
+    tokens_in = calls['tokens_in'].sum()
+    hours = max((records['timestamp'].max() - records['timestamp'].min()).total_seconds() / 3600, 1)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Runs", len(runs))
+    with col2:
+        st.metric("Throughput", f"{len(runs) / hours:.1f}/hour")
+    with col3:
+        st.metric("Prompt Cache Hits", f"{calls['cached_tokens'].sum() / tokens_in * 100:.1f}%" if tokens_in else "—")
+    with col4:
+        st.metric("API Retries", int(calls['retries'].sum()), delta=f"{int((~calls['ok']).sum())} failed calls",
+                  delta_color="off")
+    
+    # Latency per phase
+    st.markdown("### Phase Latency")
+    latencies = phase_latencies(records)
+    st.dataframe(latencies.rename(columns={
+        'phase': 'Phase', 'runs': 'Runs', 'p50': 'p50 (s)', 'p90': 'p90 (s)', 'p99': 'p99 (s)',
+        'queue_p50': 'Queue wait p50 (s)', 'queue_p90': 'Queue wait p90 (s)'
+    }), use_container_width=True, hide_index=True, column_config={
+        column: st.column_config.NumberColumn(format="%.3f")
+        for column in ['p50 (s)', 'p90 (s)', 'p99 (s)', 'Queue wait p50 (s)', 'Queue wait p90 (s)']
+    })
+    
+    # Latency and throughput over time
+    freq = 'h' if telemetry_days is not None and telemetry_days <= 7 else 'D'
+    trend = telemetry_trend(records, freq)
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=trend['bucket'], y=trend['runs'], name='Runs', yaxis='y2', opacity=0.3,
+                         marker_color='#94a3b8'))
+    for phase in PHASES:
+        if phase in trend.columns:
+            fig.add_trace(go.Scatter(x=trend['bucket'], y=trend[phase], name=f'{phase} (median s)',
+                                     mode='lines+markers', connectgaps=True))
+    fig.update_layout(
+        title=f"Median Phase Latency and Throughput (per {'hour' if freq == 'h' else 'day'})",
+        yaxis=dict(title="Seconds"),
+        yaxis2=dict(title="Runs", overlaying='y', side='right', showgrid=False),
+        height=400,
+        legend=dict(orientation='h')
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Agents: a new model or prompt version gets its own row, so regressions stand out
+    st.markdown("### Agent Usage")
+    usage = agent_usage(records)
+    if usage.empty:
+        st.info("No agent calls recorded in this period.")
+    else:
+        st.dataframe(pd.DataFrame({
+            'Agent': usage['agent'],
+            'Model': usage['model'],
+            'Prompt': usage['prompt_version'],
+            'First Seen': usage['first_seen'],
+            'Calls': usage['calls'],
+            'p50 (s)': usage['p50_seconds'],
+            'Avg Tokens In': usage['avg_tokens_in'],
+            'Avg Tokens Out': usage['avg_tokens_out'],
+            'Cache Hits': usage['cache_hit_rate'],
+            'Retries': usage['retries'],
+            'Failures': usage['failures']
+        }), use_container_width=True, hide_index=True, column_config={
+            'First Seen': st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm"),
+            'p50 (s)': st.column_config.NumberColumn(format="%.2f"),
+            'Avg Tokens In': st.column_config.NumberColumn(format="%.0f"),
+            'Avg Tokens Out': st.column_config.NumberColumn(format="%.0f"),
+            'Cache Hits': st.column_config.NumberColumn(format="%.1f%%")
+        })
+
 # Helper function for navigation
 def render_evaluation_section():
     """Render the enhanced evaluation section with tabs"""
     
-    tab1, tab2 = st.tabs(["📊 Enhanced Dashboard", "💡 Insights"])
+    tab1, tab2, tab3 = st.tabs(["📊 Enhanced Dashboard", "💡 Insights", "⏱️ Performance"])
     
     with tab1:
         show_evaluation_dashboard()
     
     with tab2:
-        show_evaluation_insights()
\ No newline at end of file
+        show_evaluation_insights()
+    
+    with tab3:
+        show_performance_telemetry()
\ No newline at end of file
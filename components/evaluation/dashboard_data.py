@@ -0,0 +1,172 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from components.evaluation.store import (
+    EvaluationStore, EMPTY_SUMMARY, create_evaluation_store
+)
+
+# Quality trend bucket size by the longest period (days) it is used for; longer
+# periods, and all time, use weekly buckets summed from the daily rollups
+TREND_BUCKETS = [(7, 'hour'), (365, 'day')]
+
+# Newest evaluations kept in the snapshot; the filtered table pages through the store instead
+SNAPSHOT_ROWS = 5000
+
+# Filtered pages remembered per snapshot
+PAGE_CACHE_SIZE = 64
+
+
+def _combine_buckets(rollups: pd.DataFrame, buckets: pd.Series) -> pd.DataFrame:
+    """Merge rollup rows into coarser buckets"""
+    combined = rollups.groupby([buckets.rename('bucket'), rollups['metric']]).agg(
+        count=('count', 'sum'), total=('total', 'sum'), min=('min', 'min'),
+        max=('max', 'max'), passed=('passed', 'sum')
+    ).reset_index()
+    combined['mean'] = combined['total'] / combined['count']
+    combined['pass_rate'] = combined['passed'] / combined['count'] * 100
+    return combined
+
+
+class EvaluationSnapshot:
+    """
+    The evaluation store at one version: its summary, the newest SNAPSHOT_ROWS
+    rows in memory (oldest first), and rollups and filtered pages read on demand.
+    Shared by every session, so the frames it returns must be treated as read-only.
+    """
+
+    def __init__(self, frame: pd.DataFrame, summary: Dict[str, Any], version, store=None):
+        self.frame = frame
+        self.summary = summary
+        self.version = version
+        self._store = store
+        self._rollups: Dict[str, pd.DataFrame] = {}
+        self._rollups_lock = threading.Lock()
+        self._pages: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._pages_lock = threading.Lock()
+        self._percentiles: Dict[Optional[int], Tuple[Optional[int], pd.DataFrame]] = {}
+
+    def rollups(self, granularity: str) -> pd.DataFrame:
+        """The store's rollups at one granularity, read once per snapshot"""
+        with self._rollups_lock:
+            if granularity not in self._rollups:
+                # Hourly buckets only chart short periods; daily ones also build the weekly trend
+                since = datetime.now() - timedelta(days=TREND_BUCKETS[0][0]) if granularity == 'hour' else None
+                self._rollups[granularity] = self._store.rollups(granularity, since=since)
+            return self._rollups[granularity]
+
+    def carry_rollups(self, previous: "EvaluationSnapshot", since: Optional[datetime]):
+        """Reuse the previous snapshot's rollups, re-reading only the buckets from `since` on"""
+        with previous._rollups_lock:
+            cached = dict(previous._rollups)
+        for granularity, rollups in cached.items():
+            if since is not None:
+                fresh = self._store.rollups(granularity, since=since)
+                cutoff = pd.Timestamp(since).floor('h' if granularity == 'hour' else 'D')
+                rollups = pd.concat([rollups[rollups['bucket'] < cutoff], fresh], ignore_index=True)
+            self._rollups[granularity] = rollups
+
+    def trend(self, days: Optional[int] = None) -> Tuple[str, pd.DataFrame]:
+        """(bucket size, rollup rows) for the quality trend over the last `days` days, or all time"""
+        granularity = next((name for limit, name in TREND_BUCKETS if days is not None and days <= limit), 'week')
+        rollups = self.rollups('day' if granularity == 'week' else granularity)
+        if days is not None:
+            cutoff = pd.Timestamp(datetime.now() - timedelta(days=days)).floor('h' if granularity == 'hour' else 'D')
+            rollups = rollups[rollups['bucket'] >= cutoff]
+        if granularity == 'week':
+            rollups = _combine_buckets(rollups, rollups['bucket'].dt.to_period('W').dt.start_time)
+        return granularity, rollups
+
+    def percentiles(self, days: Optional[int] = None) -> pd.DataFrame:
+        """Score, word-count change and latency percentiles over the last `days` days, or all time"""
+        # A time window moves, so its percentiles are reused for at most a minute
+        minute = int(time.time() // 60) if days is not None else None
+        cached = self._percentiles.get(days)
+        if cached is None or cached[0] != minute:
+            since = datetime.now() - timedelta(days=days) if days is not None else None
+            cached = self._percentiles[days] = (minute, self._store.percentiles(since=since))
+        return cached[1]
+
+    def recent(self, limit: int = 10) -> pd.DataFrame:
+        """The newest rows, oldest first; a slice of the snapshot rather than a copy"""
+        return self.frame.iloc[-limit:] if limit else self.frame.iloc[:0]
+
+    def page(self, show: str = 'all', days: Optional[int] = None, min_score: Optional[float] = None,
+             page_size: int = 50, cursor=None) -> Dict[str, Any]:
+        """
+        One page of evaluations matching the dashboard filters, queried in the
+        store over the full history. Pages are remembered until the store changes
+        (and for at most a minute when a time period applies).
+        """
+        key = (show, days, min_score, page_size, cursor, int(time.time() // 60) if days is not None else None)
+        with self._pages_lock:
+            if key in self._pages:
+                self._pages.move_to_end(key)
+                return self._pages[key]
+        result = self._store.page(show=show, days=days, min_score=min_score, page_size=page_size, cursor=cursor)
+        with self._pages_lock:
+            self._pages[key] = result
+            while len(self._pages) > PAGE_CACHE_SIZE:
+                self._pages.popitem(last=False)
+        return result
+
+
+class DashboardData:
+    """
+    Process-wide cache of the evaluation history for the dashboard, insights and
+    sidebar. A snapshot is reused until the store's version changes; the SQLite
+    store then only reads the rows added since, and re-reads trend rollups only
+    for the buckets those rows fall in.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or create_evaluation_store()
+        self._lock = threading.Lock()
+        self._snapshot = EvaluationSnapshot(pd.DataFrame(), dict(EMPTY_SUMMARY), None, self.store)
+        self._loaded = False
+
+    def snapshot(self) -> EvaluationSnapshot:
+        """The current snapshot, refreshed first if the store changed"""
+        try:
+            version = self.store.version()
+        except Exception as e:
+            print(f"Error checking evaluation store version: {e}")
+            return self._snapshot
+        if self._loaded and version == self._snapshot.version:
+            return self._snapshot
+        with self._lock:
+            if not self._loaded or version != self._snapshot.version:
+                try:
+                    self._snapshot = self._load(version)
+                    self._loaded = True
+                except Exception as e:
+                    print(f"Error loading evaluation history: {e}")
+            return self._snapshot
+
+    def _load(self, version) -> EvaluationSnapshot:
+        previous = self._snapshot
+        if isinstance(self.store, EvaluationStore) and self._loaded and not previous.frame.empty:
+            # Row ids only grow, so read just the rows saved since the last snapshot
+            added = self.store.history(after_id=int(previous.frame['id'].max()))
+            frame = pd.concat([previous.frame, added], ignore_index=True) if not added.empty else previous.frame
+            if not added.empty and added['timestamp'].min() < previous.frame['timestamp'].max():
+                # Write-behind can save rows after newer ones (e.g. recovered journal shards)
+                frame = frame.sort_values(['timestamp', 'id'], kind='stable', ignore_index=True)
+            frame = frame.iloc[-SNAPSHOT_ROWS:]
+            snapshot = EvaluationSnapshot(frame, self.store.summary(), version, self.store)
+            since = added['timestamp'].min() if not added.empty else None
+            if since is None or not pd.isna(since):
+                snapshot.carry_rollups(previous, since.to_pydatetime() if since is not None else None)
+            return snapshot
+        return EvaluationSnapshot(self.store.recent(SNAPSHOT_ROWS), self.store.summary(), version, self.store)
+
+
+@st.cache_resource
+def get_dashboard_data() -> DashboardData:
+    """The data layer shared by every session and rerun of this server process"""
+    return DashboardData()
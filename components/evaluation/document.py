@@ -0,0 +1,84 @@
+import re
+from array import array
+from bisect import bisect_right
+from functools import lru_cache, cached_property
+from typing import List
+
+# Line-start structure: H1 title, any markdown heading, numbered step. Matches
+# are zero-width so a title spanning lines cannot hide the next line's step. A
+# title line is also a heading, so the title alternative is tried first.
+# '#\s[\w\s]' accepts exactly the lines '#\s+[\w\s]+' does without backtracking.
+STRUCTURE_PATTERN = re.compile(
+    r'^(?=(?P<title>#\s[\w\s])|(?P<heading>#+\s)|(?P<numbered_steps>\d+\.\s))',
+    re.IGNORECASE | re.MULTILINE
+)
+
+SENTENCE_SPLIT = re.compile(r'[.!?]+')
+
+NEWLINE = re.compile('\n')
+
+
+class ParsedDocument:
+    """
+    One text tokenized once. Line offsets, structural line numbers and sentence
+    word counts are kept in compact arrays; rules and UI statistics read them
+    here instead of re-splitting the text.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lower = text.lower()
+        self.word_count = len(text.split())
+
+        # Offset where each line starts; '^' in MULTILINE mode only matches after '\n'
+        self.line_starts = array('L', [0])
+        self.line_starts.extend(match.end() for match in NEWLINE.finditer(text))
+
+        self.title_lines = array('L')
+        self.heading_lines = array('L')
+        self.numbered_step_lines = array('L')
+        for match in STRUCTURE_PATTERN.finditer(text):
+            line = bisect_right(self.line_starts, match.start()) - 1
+            if match.lastgroup == 'numbered_steps':
+                self.numbered_step_lines.append(line)
+            else:
+                self.heading_lines.append(line)
+                if match.lastgroup == 'title':
+                    self.title_lines.append(line)
+
+        self.sentence_word_counts = array('L', (len(sentence.split()) for sentence in SENTENCE_SPLIT.split(text)))
+
+    @cached_property
+    def lines(self) -> List[str]:
+        return self.text.split('\n')
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        """Lowercase whitespace-separated tokens"""
+        return self.lower.split()
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_starts)
+
+    @property
+    def sentence_count(self) -> int:
+        return len(self.sentence_word_counts)
+
+    def headings(self) -> List[str]:
+        """Text of every markdown heading line"""
+        return [self.lines[line] for line in self.heading_lines]
+
+    def numbered_steps(self) -> List[str]:
+        """Text of every numbered step line"""
+        return [self.lines[line] for line in self.numbered_step_lines]
+
+    def count_long_sentences(self, max_words: int) -> int:
+        """Sentences with more than max_words words"""
+        return sum(1 for count in self.sentence_word_counts if count > max_words)
+
+
+@lru_cache(maxsize=8)
+def parse_document(text: str) -> ParsedDocument:
+    """Parse a text, reusing the result while the same text is being evaluated and displayed"""
+    return ParsedDocument(text)
@@ -0,0 +1,42 @@
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of the points Largest-Triangle-Three-Buckets keeps to draw a series
+    with at most `threshold` points. The first and last points are always kept;
+    every bucket in between keeps the point that spans the largest triangle with
+    the previously kept point and the next bucket's average, so peaks and dips
+    survive. x must be sorted; NaN y values are never chosen over real ones.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    filled = np.where(np.isnan(y), np.nanmean(y) if not np.isnan(y).all() else 0.0, y)
+    # Bucket edges over the points between the first and the last
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+        else:
+            next_start, next_end = n - 1, n
+        average_x = x[next_start:next_end].mean()
+        average_y = filled[next_start:next_end].mean()
+
+        areas = np.abs(
+            (x[previous] - average_x) * (filled[start:end] - filled[previous])
+            - (x[previous] - x[start:end]) * (average_y - filled[previous])
+        )
+        areas[np.isnan(y[start:end])] = -1
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
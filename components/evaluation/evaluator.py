@@ -1,15 +1,45 @@
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, Any, List
-import re
 import os
 import json
-import numpy as np
+import uuid
+import time
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from components.artifacts import content_hash
+from components.evaluation.store import create_evaluation_store, evaluation_backend, EMPTY_SUMMARY
+from components.evaluation.runs import RunArchive
+from components.evaluation.telemetry import TelemetryStore
+from components.evaluation.persistence import get_write_behind_queue
+from components.evaluation.document import parse_document
+from components.evaluation.rules import (
+    SCORING_VERSION, TEMPLATE_ELEMENTS, scan_document, scan_budget, count_long_sentences, identify_gaps,
+    gap_resolution_checks
+)
+
+# Scoring runs here so callers (the Streamlit script thread) are not blocked by it
+SCORING_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="evaluation")
+
+# Write-behind journals, one subdirectory per backend
+JOURNAL_DIR = "components/data/journal"
 
 class DocumentEvaluator:
-    def __init__(self):
+    def __init__(self, backend: str = None):
         self.evaluation_file = "components/data/evaluations.csv"
         self.ensure_data_directory()
+        backend = evaluation_backend(backend)
+        self.store = create_evaluation_store(backend)
+        self.runs = RunArchive()
+        self.telemetry = TelemetryStore()
+        # Each backend gets its own journal and writer, so items are flushed into
+        # the store they were evaluated for. Shards from the older shared journal
+        # directory belong to the configured backend, which was the only one used.
+        self.writer = get_write_behind_queue(
+            self._persist, os.path.join(JOURNAL_DIR, backend),
+            legacy_dir=JOURNAL_DIR if backend == evaluation_backend() else None
+        )
     
     def ensure_data_directory(self):
         """Create data directory if it doesn't exist"""
@@ -19,15 +49,100 @@ class DocumentEvaluator:
                             original_content: str, 
                             analysis_report: str, 
                             final_output: str, 
-                            user_id: str = "anonymous") -> Dict[str, Any]:
+                            user_id: str = "anonymous",
+                            redlined_version: str = None,
+                            clean_draft: str = None,
+                            timings: Dict[str, float] = None,
+                            telemetry: List[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Enhanced evaluation with template compliance and style violation precision/recall
         """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(SCORING_EXECUTOR, partial(
+            self.evaluate, original_content, analysis_report, final_output, user_id, redlined_version, clean_draft,
+            timings, telemetry, queued_at=time.perf_counter()
+        ))
+    
+    def submit_evaluation(self, 
+                          original_content: str, 
+                          analysis_report: str, 
+                          final_output: str, 
+                          user_id: str = "anonymous",
+                          redlined_version: str = None,
+                          clean_draft: str = None,
+                          timings: Dict[str, float] = None,
+                          telemetry: List[Dict[str, Any]] = None) -> Future:
+        """Start an evaluation on the scoring executor and return its future"""
+        return SCORING_EXECUTOR.submit(
+            self.evaluate, original_content, analysis_report, final_output, user_id, redlined_version, clean_draft,
+            timings, telemetry, queued_at=time.perf_counter()
+        )
+    
+    def evaluate(self, 
+                 original_content: str, 
+                 analysis_report: str, 
+                 final_output: str, 
+                 user_id: str = "anonymous",
+                 redlined_version: str = None,
+                 clean_draft: str = None,
+                 timings: Dict[str, float] = None,
+                 telemetry: List[Dict[str, Any]] = None,
+                 queued_at: float = None) -> Dict[str, Any]:
+        """
+        Score one document and queue it, with its texts, for write-behind persistence.
+        `timings` holds the seconds the caller spent in earlier pipeline phases
+        (analysis_seconds, style_seconds) and `telemetry` the agent call records
+        of those phases; scoring time, and the wait since `queued_at`
+        (a perf_counter value), are measured here.
+        """
+        started = time.perf_counter()
+        evaluation_results = self.score_document(original_content, analysis_report, final_output, user_id)
+        evaluation_results['scoring_seconds'] = time.perf_counter() - started
+        evaluation_results.update(timings or {})
+        evaluation_results['run_id'] = uuid.uuid4().hex
+        evaluation_results['original_hash'] = content_hash(original_content.encode('utf-8'))
+        evaluation_results['analysis_hash'] = content_hash(analysis_report.encode('utf-8'))
+        evaluation_results['final_hash'] = content_hash(final_output.encode('utf-8'))
+        
+        # Keep the texts so the run can be replayed and re-scored when the rules change
+        self._save_evaluation(evaluation_results, {
+            'original_content': original_content,
+            'analysis_report': analysis_report,
+            'final_output': final_output,
+            'redlined_version': redlined_version,
+            'clean_draft': clean_draft
+        }, list(telemetry or []) + [{
+            'phase': 'evaluation',
+            'seconds': evaluation_results['scoring_seconds'],
+            'queue_seconds': started - queued_at if queued_at is not None else None,
+            'ok': True
+        }])
+        
+        return evaluation_results
+    
+    def score_document(self, 
+                       original_content: str, 
+                       analysis_report: str, 
+                       final_output: str, 
+                       user_id: str = "anonymous") -> Dict[str, Any]:
+        """
+        Score one document without saving the result. Rule scans share one time
+        budget; if it runs out the scores cover what was scanned and
+        scan_partial is set.
+        """
+        with scan_budget():
+            return self._score_document(original_content, analysis_report, final_output, user_id)
+    
+    def _score_document(self, 
+                        original_content: str, 
+                        analysis_report: str, 
+                        final_output: str, 
+                        user_id: str) -> Dict[str, Any]:
         evaluation_results = {
             'timestamp': datetime.now().isoformat(),
             'user_id': user_id,
-            'original_word_count': len(original_content.split()),
-            'final_word_count': len(final_output.split()),
+            'original_word_count': parse_document(original_content).word_count,
+            'final_word_count': parse_document(final_output).word_count,
             'processing_successful': True
         }
         
@@ -60,9 +175,9 @@ class DocumentEvaluator:
         evaluation_results['overall_score'] = (template_results['score'] + 
                                              style_results['score'] + 
                                              gap_resolution_score) / 3
-        
-        # Save to CSV for tracking
-        self._save_evaluation(evaluation_results)
+        evaluation_results['scoring_version'] = SCORING_VERSION
+        evaluation_results['scan_partial'] = (scan_document(original_content, structure=False)['partial'] or
+                                              scan_document(final_output)['partial'])
         
         return evaluation_results
     
@@ -71,25 +186,11 @@ class DocumentEvaluator:
         E1: Check adherence to The Good Docs Project template structure
         Returns compliance rate and specific missing elements
         """
-        template_elements = {
-            'title': r'^#\s+[\w\s]+',  # Has proper H1 title
-            'introduction': r'(this guide|this tutorial|this document|this how-to)',  # Has intro
-            'prerequisites': r'(prerequisite|requirements|before you begin|you need|you must have)',
-            'numbered_steps': r'^\d+\.\s+',  # Has numbered procedures
-            'action_verbs': r'(click|select|enter|navigate|open|create|run|configure|install|setup)',
-            'success_criteria': r'(success|complete|result|verify|confirmation|expected|should see)',
-            'troubleshooting': r'(troubleshoot|problem|error|if.*fail|common issues|if you encounter)'
-        }
-        
-        compliance_score = 0
-        total_elements = len(template_elements)
-        missing_elements = []
+        present = scan_document(final_output)['template_elements']
         
-        for element, pattern in template_elements.items():
-            if re.search(pattern, final_output, re.IGNORECASE | re.MULTILINE):
-                compliance_score += 1
-            else:
-                missing_elements.append(element)
+        total_elements = len(TEMPLATE_ELEMENTS)
+        missing_elements = [element for element in TEMPLATE_ELEMENTS if element not in present]
+        compliance_score = total_elements - len(missing_elements)
         
         compliance_rate = compliance_score / total_elements
         
@@ -106,30 +207,9 @@ class DocumentEvaluator:
         E2: Precision/recall for style rule enforcement
         Measures how effectively violations were removed
         """
-        violations = {
-            'passive_voice': r'\b(is|was|were|being|been)\s+\w+ed\b',
-            'future_tense': r'\bwill\s+\w+',
-            'long_sentences': self._count_long_sentences,  # Custom function for accuracy
-            'corporate_jargon': r'\b(reach out|touch base|circle back|leverage|synergy)\b',
-            'please_usage': r'\bplease\b',
-            'ampersands': r'&(?!amp;|lt;|gt;|quot;|#)'
-        }
-        
-        # Count violations in original vs final
-        original_violations = {}
-        final_violations = {}
-        
-        for violation_type, pattern in violations.items():
-            if callable(pattern):
-                # Handle custom functions like long sentences
-                original_count = pattern(original)
-                final_count = pattern(final_output)
-            else:
-                original_count = len(re.findall(pattern, original, re.IGNORECASE))
-                final_count = len(re.findall(pattern, final_output, re.IGNORECASE))
-            
-            original_violations[violation_type] = original_count
-            final_violations[violation_type] = final_count
+        # Count violations in original vs final (one scan per text)
+        original_violations = dict(scan_document(original, structure=False)['violations'])
+        final_violations = dict(scan_document(final_output)['violations'])
         
         # Calculate precision/recall for violation removal
         total_original = sum(original_violations.values())
@@ -156,35 +236,12 @@ class DocumentEvaluator:
     
     def _count_long_sentences(self, content: str) -> int:
         """Helper function to accurately count sentences over 26 words"""
-        sentences = re.split(r'[.!?]+', content)
-        long_sentences = 0
-        
-        for sentence in sentences:
-            words = sentence.strip().split()
-            if len(words) > 26:
-                long_sentences += 1
-        
-        return long_sentences
+        return count_long_sentences(content)
     
     def _check_gap_resolution(self, analysis_report: str, final_output: str) -> int:
         """Check if identified gaps were resolved (H9) - kept from original"""
         # Identify gaps mentioned in analysis report
-        identified_gaps = []
-        gap_indicators = [
-            ('missing prerequisites', 'prerequisites'),
-            ('unclear steps', 'step_clarity'),
-            ('missing introduction', 'introduction'),
-            ('poor step ordering', 'step_ordering'),
-            ('inconsistent formatting', 'formatting'),
-            ('missing success criteria', 'success_criteria'),
-            ('missing troubleshooting', 'troubleshooting'),
-            ('passive voice', 'passive_voice'),
-            ('long sentences', 'sentence_length')
-        ]
-        
-        for indicator, gap_type in gap_indicators:
-            if indicator.lower() in analysis_report.lower():
-                identified_gaps.append(gap_type)
+        identified_gaps = identify_gaps(analysis_report)
         
         if not identified_gaps:
             return 5  # No gaps identified, perfect score
@@ -213,23 +270,7 @@ class DocumentEvaluator:
     
     def _is_gap_resolved(self, gap_type: str, final_output: str) -> bool:
         """Check if a specific gap type was resolved"""
-        content_lower = final_output.lower()
-        
-        resolution_checks = {
-            'prerequisites': any(keyword in content_lower for keyword in 
-                               ['prerequisite', 'requirements', 'before you begin', 'you need']),
-            'step_clarity': any(keyword in content_lower for keyword in 
-                              ['click', 'select', 'enter', 'navigate', 'open', 'create', 'run']),
-            'introduction': content_lower.startswith(('this guide', 'this tutorial', 'this document', 'this how-to')),
-            'step_ordering': '1.' in final_output and '2.' in final_output,
-            'formatting': bool(re.search(r'^#+\s', final_output, re.MULTILINE)),  # Headers present
-            'success_criteria': any(keyword in content_lower for keyword in 
-                                  ['success', 'complete', 'finished', 'result', 'expected']),
-            'troubleshooting': any(keyword in content_lower for keyword in 
-                                 ['troubleshoot', 'problem', 'issue', 'error', 'if you encounter']),
-            'passive_voice': self._count_long_sentences(final_output) < 3,
-            'sentence_length': len(re.findall(r'\bis\s+\w+ed\b|\bwas\s+\w+ed\b', final_output, re.IGNORECASE)) < 3
-        }
+        resolution_checks = gap_resolution_checks(scan_document(final_output))
         
         return resolution_checks.get(gap_type, False)
     
@@ -237,70 +278,71 @@ class DocumentEvaluator:
         """Count how many gaps were fixed"""
         return "Gap analysis completed"
     
-    def _save_evaluation(self, results: Dict[str, Any]):
-        """Save evaluation results to CSV"""
+    def _save_evaluation(self, results: Dict[str, Any], texts: Dict[str, str],
+                         telemetry: List[Dict[str, Any]] = None):
+        """Queue evaluation results, run texts and phase telemetry for the write-behind writer"""
         try:
-            # Try to read existing file
-            if os.path.exists(self.evaluation_file):
-                df = pd.read_csv(self.evaluation_file)
-                # Convert results to DataFrame and concatenate
-                new_row = pd.DataFrame([results])
-                df = pd.concat([df, new_row], ignore_index=True)
-            else:
-                # Create new DataFrame
-                df = pd.DataFrame([results])
-            
-            # Save to CSV
-            df.to_csv(self.evaluation_file, index=False)
-            
+            self.writer.put({'results': results, 'texts': texts, 'telemetry': telemetry or [],
+                             'queued_at': time.time()})
         except Exception as e:
             print(f"Error saving evaluation: {e}")
     
+    def _persist(self, items: List[Dict[str, Any]]):
+        """Write a batch from the write-behind queue; safe to repeat for the same runs"""
+        flush_started = time.time()
+        started = time.perf_counter()
+        for item in items:
+            results = item['results']
+            self.runs.save_run(results['run_id'], results['timestamp'], results['user_id'], item['texts'])
+        self.runs.save_scores([item['results'] for item in items])
+        self.store.save_many([item['results'] for item in items])
+        self._record_telemetry(items, time.perf_counter() - started, flush_started)
+    
+    def _record_telemetry(self, items: List[Dict[str, Any]], seconds: float, flush_started: float):
+        """Save each run's phase records plus its persistence phase (the batch's write time)"""
+        records = []
+        for item in items:
+            results = item['results']
+            run = {'run_id': results['run_id'], 'timestamp': results['timestamp']}
+            records.extend(dict(record, **run) for record in item.get('telemetry', []))
+            queued_at = item.get('queued_at')
+            records.append(dict(run, phase='persistence', seconds=seconds, ok=True,
+                                queue_seconds=flush_started - queued_at if queued_at else None))
+        try:
+            self.telemetry.save_many(records)
+        except Exception as e:
+            print(f"Error saving telemetry: {e}")
+    
     def get_recent_evaluations(self, limit: int = 10) -> pd.DataFrame:
         """Get recent evaluation results"""
         try:
-            if os.path.exists(self.evaluation_file):
-                df = pd.read_csv(self.evaluation_file)
-                return df.tail(limit)
-            else:
-                return pd.DataFrame()
+            return self.store.recent(limit)
         except Exception as e:
             print(f"Error loading evaluations: {e}")
             return pd.DataFrame()
     
+    def query_evaluations(self, show: str = 'all', days: int = None, 
+                          min_score: float = None, limit: int = 20) -> pd.DataFrame:
+        """Get the newest evaluations matching the dashboard filters"""
+        try:
+            return self.store.query(show=show, days=days, min_score=min_score, limit=limit)
+        except Exception as e:
+            print(f"Error querying evaluations: {e}")
+            return pd.DataFrame()
+    
+    def get_evaluation_percentiles(self, days: int = None) -> pd.DataFrame:
+        """p50/p90/p99 of overall score, word-count change and phase latencies over the last `days` days"""
+        try:
+            since = datetime.now() - timedelta(days=days) if days is not None else None
+            return self.store.percentiles(since=since)
+        except Exception as e:
+            print(f"Error getting evaluation percentiles: {e}")
+            return pd.DataFrame()
+    
     def get_evaluation_summary(self) -> Dict[str, Any]:
         """Get summary statistics of all evaluations"""
         try:
-            if not os.path.exists(self.evaluation_file):
-                return {
-                    'total_evaluations': 0,
-                    'template_compliance_rate': 0,
-                    'violation_reduction_rate': 0,
-                    'gap_resolution_rate': 0,
-                    'overall_pass_rate': 0,
-                    'avg_template_score': 0,
-                    'avg_style_score': 0
-                }
-            
-            df = pd.read_csv(self.evaluation_file)
-            
-            return {
-                'total_evaluations': len(df),
-                'template_compliance_rate': df['e1_template_compliance_rate'].mean() * 100 if 'e1_template_compliance_rate' in df.columns else 0,
-                'violation_reduction_rate': df['e2_violation_reduction_rate'].mean() * 100 if 'e2_violation_reduction_rate' in df.columns else 0,
-                'gap_resolution_rate': df['h9_pass'].mean() * 100 if 'h9_pass' in df.columns else 0,
-                'overall_pass_rate': df['overall_pass'].mean() * 100 if 'overall_pass' in df.columns else 0,
-                'avg_template_score': df['e1_template_score'].mean() if 'e1_template_score' in df.columns else 0,
-                'avg_style_score': df['e2_style_score'].mean() if 'e2_style_score' in df.columns else 0,
-                'avg_overall_score': df['overall_score'].mean() if 'overall_score' in df.columns else 0
-            }
-            
+            return self.store.summary()
         except Exception as e:
             print(f"Error getting evaluation summary: {e}")
-            return {
-                'total_evaluations': 0,
-                'template_compliance_rate': 0,
-                'violation_reduction_rate': 0,
-                'gap_resolution_rate': 0,
-                'overall_pass_rate': 0
-            }
\ No newline at end of file
+            return dict(EMPTY_SUMMARY)
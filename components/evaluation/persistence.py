@@ -0,0 +1,294 @@
+import atexit
+import glob
+import json
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: shards of dead processes are not recovered automatically
+    fcntl = None
+
+# Process-wide queues by journal directory, so evaluators writing to the same store share one writer thread
+_QUEUES: Dict[str, "WriteBehindQueue"] = {}
+_QUEUES_LOCK = threading.Lock()
+
+# Single journal used before shards were per process; adopted as a shard on start
+LEGACY_JOURNAL = "components/data/evaluation_journal.jsonl"
+
+# Batches that still fail after this many attempts are set aside so later items keep flowing
+MAX_FLUSH_ATTEMPTS = 5
+
+# Items set aside after MAX_FLUSH_ATTEMPTS, in journal format: rename the file to
+# <anything>.jsonl in the same directory and the next recovery pass replays it
+DEAD_LETTER_FILE = "dead-letter.jsonl.failed"
+
+
+def _replace_atomically(path: str, text: str):
+    """Write a small file so readers see either the old or the new contents"""
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def _read_checkpoint(shard_path: str) -> int:
+    try:
+        with open(shard_path + ".checkpoint", encoding='utf-8') as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def _read_entries(f, offset: int) -> List[tuple]:
+    """(item, end offset) for every complete journal line after offset; a torn last line is dropped"""
+    entries = []
+    f.seek(offset)
+    for line in f:
+        if not line.endswith(b'\n'):
+            # Torn final write (put() never returned for it); drop it so
+            # the next entry starts on a clean line
+            f.truncate(offset)
+            break
+        offset += len(line)
+        try:
+            entries.append((json.loads(line), offset))
+        except ValueError:
+            continue
+    return entries
+
+
+def _try_lock(f) -> bool:
+    """Take the shard's ownership lock without blocking"""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+class WriteBehindQueue:
+    """
+    Persists items on a background thread in batches. Every process appends to
+    its own journal shard, so concurrent server processes never share a file or
+    take a lock to write. Each item is fsynced before put() returns. A
+    checkpoint next to the shard records how much has been flushed into the
+    merged store. Shards left by processes that died are found by their
+    released ownership lock and flushed by a live process. Replays can repeat a
+    batch that was written just before a crash, so `flush` must be idempotent.
+    A batch that fails max_attempts times, with growing delays, is appended to
+    the dead-letter file and skipped. `legacy_dir` is a journal directory from
+    an older layout whose shards this queue also recovers.
+    """
+
+    def __init__(self, flush: Callable[[List[Dict[str, Any]]], None],
+                 journal_dir: str = "components/data/journal",
+                 batch_size: int = 50, flush_interval: float = 0.5, retry_delay: float = 2.0,
+                 recover_interval: float = 30.0, max_attempts: int = MAX_FLUSH_ATTEMPTS,
+                 legacy_dir: Optional[str] = None):
+        self._flush = flush
+        self.journal_dir = journal_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_delay = retry_delay
+        self.recover_interval = recover_interval
+        self.max_attempts = max_attempts
+        self.legacy_dir = legacy_dir
+        self.dead_letter_path = os.path.join(journal_dir, DEAD_LETTER_FILE)
+
+        self._queue = queue.Queue()
+        self._journal_lock = threading.Lock()
+        self._idle = threading.Condition()
+        self._pending = 0
+        self._closed = False
+
+        os.makedirs(journal_dir, exist_ok=True)
+        if legacy_dir is not None:
+            self._adopt_legacy_journal()
+        self.shard_path = os.path.join(
+            journal_dir, f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl"
+        )
+        self._journal = open(self.shard_path, 'ab')
+        _try_lock(self._journal)
+        self._thread = threading.Thread(target=self._run, name="evaluation-write-behind", daemon=True)
+        self._thread.start()
+
+    def _adopt_legacy_journal(self):
+        """Move a journal from the single-file layout into the shard directory"""
+        if not os.path.exists(LEGACY_JOURNAL):
+            return
+        shard_path = os.path.join(self.journal_dir, f"legacy-{uuid.uuid4().hex[:8]}.jsonl")
+        try:
+            if os.path.exists(LEGACY_JOURNAL + ".checkpoint"):
+                os.replace(LEGACY_JOURNAL + ".checkpoint", shard_path + ".checkpoint")
+            os.replace(LEGACY_JOURNAL, shard_path)
+        except OSError:
+            pass  # another process adopted it first
+
+    def put(self, item: Dict[str, Any]):
+        """Journal an item durably in this process's shard and queue it for the writer thread"""
+        line = (json.dumps(item, default=str) + '\n').encode('utf-8')
+        with self._journal_lock:
+            if self._closed:
+                raise RuntimeError("Write-behind queue is closed")
+            self._journal.write(line)
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            end_offset = self._journal.tell()
+            with self._idle:
+                self._pending += 1
+            self._queue.put((item, end_offset))
+
+    def _flush_with_retry(self, items: List[Dict[str, Any]]):
+        """Flush a batch, retrying with doubling delays; after max_attempts it is dead-lettered"""
+        for attempt in range(self.max_attempts):
+            if not items:
+                return
+            try:
+                self._flush(items)
+                return
+            except Exception as e:
+                print(f"Error flushing evaluations (attempt {attempt + 1} of {self.max_attempts}): {e}")
+                if attempt + 1 < self.max_attempts:
+                    time.sleep(self.retry_delay * 2 ** attempt)
+        self._dead_letter(items)
+
+    def _dead_letter(self, items: List[Dict[str, Any]]):
+        """Set aside items that could not be flushed, so the checkpoint can move past them"""
+        print(f"Error flushing evaluations: moving {len(items)} item(s) to {self.dead_letter_path}")
+        try:
+            with open(self.dead_letter_path, 'ab') as f:
+                for item in items:
+                    f.write((json.dumps(item, default=str) + '\n').encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            print(f"Error writing dead-letter file, dropping {len(items)} item(s): {e}")
+
+    def _next_batch(self, timeout: float) -> List[tuple]:
+        """Wait up to timeout for one item, then gather more for up to flush_interval"""
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        next_recovery = time.monotonic()
+        while True:
+            if time.monotonic() >= next_recovery:
+                self.recover_orphaned_shards()
+                next_recovery = time.monotonic() + self.recover_interval
+
+            batch = self._next_batch(timeout=max(0.0, next_recovery - time.monotonic()))
+            if not batch:
+                continue
+            items = [item for item, _ in batch if item is not None]
+            self._flush_with_retry(items)
+            self._checkpoint(batch[-1][1])
+            with self._idle:
+                self._pending -= len(items)
+                self._idle.notify_all()
+            if any(item is None for item, _ in batch):
+                return
+
+    def _checkpoint(self, offset: int):
+        """Record flushed progress and start a fresh shard file once everything is flushed"""
+        with self._journal_lock:
+            if self._queue.empty() and self._journal.tell() == offset:
+                # Reset the checkpoint before truncating: a crash in between
+                # replays (idempotently) rather than skipping new entries
+                _replace_atomically(self.shard_path + ".checkpoint", '0')
+                self._journal.truncate(0)
+                self._journal.seek(0)
+                os.fsync(self._journal.fileno())
+            else:
+                _replace_atomically(self.shard_path + ".checkpoint", str(offset))
+
+    def recover_orphaned_shards(self) -> int:
+        """Flush and remove shards whose owning process is gone; returns entries recovered"""
+        if fcntl is None:
+            return 0
+        recovered = 0
+        shard_paths = glob.glob(os.path.join(self.journal_dir, "*.jsonl"))
+        if self.legacy_dir is not None:
+            shard_paths += glob.glob(os.path.join(self.legacy_dir, "*.jsonl"))
+        for shard_path in shard_paths:
+            if shard_path == self.shard_path:
+                continue
+            try:
+                f = open(shard_path, 'r+b')
+            except OSError:
+                continue  # removed by another process meanwhile
+            try:
+                if not _try_lock(f) or not os.path.exists(shard_path):
+                    continue  # owner still running, or already recovered
+                entries = _read_entries(f, _read_checkpoint(shard_path))
+                for start in range(0, len(entries), self.batch_size):
+                    batch = entries[start:start + self.batch_size]
+                    self._flush_with_retry([item for item, _ in batch])
+                    _replace_atomically(shard_path + ".checkpoint", str(batch[-1][1]))
+                recovered += len(entries)
+                os.remove(shard_path)
+                if os.path.exists(shard_path + ".checkpoint"):
+                    os.remove(shard_path + ".checkpoint")
+            finally:
+                f.close()
+        return recovered
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every item queued by this process has been flushed"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """Flush what is queued, stop the writer thread and remove the drained shard"""
+        with self._journal_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put((None, self._journal.tell()))
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            return  # still flushing; the shard is recovered by the next process
+        drained = self._journal.tell() == 0
+        self._journal.close()
+        if drained:
+            for path in (self.shard_path, self.shard_path + ".checkpoint"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+def get_write_behind_queue(flush: Callable[[List[Dict[str, Any]]], None],
+                           journal_dir: str = "components/data/journal",
+                           legacy_dir: Optional[str] = None) -> WriteBehindQueue:
+    """
+    Return the process-wide queue for a journal directory, starting it on first
+    use. The queue flushes with the first caller's `flush`, so every store needs
+    its own journal directory.
+    """
+    key = os.path.abspath(journal_dir)
+    with _QUEUES_LOCK:
+        if key not in _QUEUES:
+            write_queue = WriteBehindQueue(flush, journal_dir, legacy_dir=legacy_dir)
+            atexit.register(write_queue.close)
+            _QUEUES[key] = write_queue
+        return _QUEUES[key]
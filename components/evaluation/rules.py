@@ -0,0 +1,330 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Iterable, Tuple, Optional
+
+from components.evaluation.document import ParsedDocument, parse_document
+
+# Identifies the rule set below. Bump it whenever a pattern, threshold or score
+# changes so a backfill writes a new, separately comparable set of scores.
+SCORING_VERSION = 1
+
+# E1: The Good Docs Project template elements
+TEMPLATE_ELEMENTS = {
+    'title': r'^#\s+[\w\s]+',  # Has proper H1 title
+    'introduction': r'(this guide|this tutorial|this document|this how-to)',  # Has intro
+    'prerequisites': r'(prerequisite|requirements|before you begin|you need|you must have)',
+    'numbered_steps': r'^\d+\.\s+',  # Has numbered procedures
+    'action_verbs': r'(click|select|enter|navigate|open|create|run|configure|install|setup)',
+    'success_criteria': r'(success|complete|result|verify|confirmation|expected|should see)',
+    'troubleshooting': r'(troubleshoot|problem|error|if.*fail|common issues|if you encounter)'
+}
+
+# E2: Style violations (long_sentences is counted from the sentence split)
+STYLE_VIOLATIONS = {
+    'passive_voice': r'\b(is|was|were|being|been)\s+\w+ed\b',
+    'future_tense': r'\bwill\s+\w+',
+    'long_sentences': None,
+    'corporate_jargon': r'\b(reach out|touch base|circle back|leverage|synergy)\b',
+    'please_usage': r'\bplease\b',
+    'ampersands': r'&(?!amp;|lt;|gt;|quot;|#)'
+}
+
+LONG_SENTENCE_WORDS = 26
+
+# H9: (phrase in analysis report, gap type)
+GAP_INDICATORS = [
+    ('missing prerequisites', 'prerequisites'),
+    ('unclear steps', 'step_clarity'),
+    ('missing introduction', 'introduction'),
+    ('poor step ordering', 'step_ordering'),
+    ('inconsistent formatting', 'formatting'),
+    ('missing success criteria', 'success_criteria'),
+    ('missing troubleshooting', 'troubleshooting'),
+    ('passive voice', 'passive_voice'),
+    ('long sentences', 'sentence_length')
+]
+
+# H9: keywords (matched in the lowercased final output) that resolve a gap
+GAP_RESOLUTION_KEYWORDS = {
+    'prerequisites': ['prerequisite', 'requirements', 'before you begin', 'you need'],
+    'step_clarity': ['click', 'select', 'enter', 'navigate', 'open', 'create', 'run'],
+    'success_criteria': ['success', 'complete', 'finished', 'result', 'expected'],
+    'troubleshooting': ['troubleshoot', 'problem', 'issue', 'error', 'if you encounter']
+}
+
+INTRODUCTION_PREFIXES = ('this guide', 'this tutorial', 'this document', 'this how-to')
+
+# Limits for pasted logs, generated text and other huge inputs. Only the first
+# MAX_SCAN_CHARS characters of a text are checked against the rules, and one
+# evaluation stops scanning after SCAN_TIME_BUDGET seconds; both cases are
+# recorded in the result's scan_partial flag.
+MAX_SCAN_CHARS = int(os.getenv("DOCUALIGN_MAX_SCAN_CHARS", 2_000_000))
+SCAN_TIME_BUDGET = float(os.getenv("DOCUALIGN_SCAN_TIME_BUDGET", 5.0))
+# Style violations are scanned in chunks of about this size, checking the budget between them
+SCAN_CHUNK_CHARS = 64 * 1024
+
+# Deadline (time.monotonic()) of the evaluation running in this thread, if any
+_DEADLINE: ContextVar[Optional[float]] = ContextVar('scan_deadline', default=None)
+
+
+# The only non-ASCII characters that re.IGNORECASE matches to an ASCII letter, or
+# whose lower() contains one. Without them, searching the lowercased text for a
+# lowercase ASCII keyword gives exactly the IGNORECASE result.
+CASE_FOLD_EXCEPTIONS = re.compile('[\u0130\u0131\u017f\u212a]')
+
+
+def lowercase_is_exact(text: str) -> bool:
+    """True when substring search on text.lower() matches re.IGNORECASE for ASCII keywords"""
+    return text.isascii() or CASE_FOLD_EXCEPTIONS.search(text) is None
+
+
+class KeywordSet:
+    """
+    Case-insensitive "does any keyword occur" check compiled once.
+    Normally answered with C substring search on the lowercased text; text with
+    one of the CASE_FOLD_EXCEPTIONS goes through the compiled IGNORECASE
+    alternation so the result matches re semantics exactly.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(keyword.lower() for keyword in keywords)
+        self._pattern = re.compile('|'.join(re.escape(keyword) for keyword in self.keywords), re.IGNORECASE)
+
+    def search(self, text: str, text_lower: str, lowercase_exact: bool) -> bool:
+        if lowercase_exact:
+            return any(keyword in text_lower for keyword in self.keywords)
+        return self._pattern.search(text) is not None
+
+
+def _literal_alternatives(pattern: str) -> List[str]:
+    """Split a '(a|b|c)' template pattern into its literal alternatives"""
+    return pattern.strip('()').split('|')
+
+
+# Literal template elements become keyword sets; 'if.*fail' is checked by has_if_then_fail
+TEMPLATE_KEYWORDS = {
+    element: KeywordSet(keyword for keyword in _literal_alternatives(TEMPLATE_ELEMENTS[element]) if keyword != 'if.*fail')
+    for element in ('introduction', 'prerequisites', 'action_verbs', 'success_criteria', 'troubleshooting')
+}
+IF_WORD = re.compile('if', re.IGNORECASE)
+FAIL_WORD = re.compile('fail', re.IGNORECASE)
+
+
+def has_if_then_fail(content: str) -> bool:
+    """
+    Same result as re.search(r'if.*fail', content, re.I | re.M) in linear time.
+    The regex retries '.*' from every "if" on a line; here each line is searched
+    once from its first "if".
+    """
+    pos = 0
+    while True:
+        match = IF_WORD.search(content, pos)
+        if match is None:
+            return False
+        line_end = content.find('\n', match.end())
+        if line_end == -1:
+            line_end = len(content)
+        if FAIL_WORD.search(content, match.end(), line_end) is not None:
+            return True
+        pos = line_end + 1
+
+
+# Every regex violation in one consuming scan. The leading class lets the engine
+# skip positions that cannot start any rule. future_tense only consumes "will"
+# (its full span is read from the lookahead) so the following word is still
+# checked by the other rules, which keeps each rule's count equal to re.findall.
+# Backtracking is bounded by the whitespace run and word after one keyword, so
+# a scan is linear in the text length.
+VIOLATION_PATTERN = re.compile(
+    r'(?=[iwbrtclsp&])(?:'
+    r'\b(?:(?P<passive_voice>(?:(?P<passive_is_was>is|was)|were|being|been)\s+\w+ed\b)'
+    r'|(?P<future_tense>will(?=(?P<future_rest>\s+\w+)))'
+    r'|(?P<corporate_jargon>(?:reach out|touch base|circle back|leverage|synergy)\b)'
+    r'|(?P<please_usage>please\b))'
+    r'|(?P<ampersands>&(?!amp;|lt;|gt;|quot;|#)))',
+    re.IGNORECASE
+)
+
+# A chunk may end after a line whose last character is neither whitespace nor a
+# word character: no violation match can span such a line break
+CHUNK_BOUNDARY = re.compile(r'[^\w\s]\n')
+
+
+@contextmanager
+def scan_budget(seconds: float = SCAN_TIME_BUDGET):
+    """Stop rule scans in this thread once `seconds` have passed"""
+    token = _DEADLINE.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+
+def _out_of_time() -> bool:
+    deadline = _DEADLINE.get()
+    return deadline is not None and time.monotonic() > deadline
+
+
+def capped_length(content: str, max_chars: int = MAX_SCAN_CHARS) -> int:
+    """How much of a text is scanned: all of it, or up to the last line break within max_chars"""
+    if len(content) <= max_chars:
+        return len(content)
+    line_end = content.rfind('\n', 0, max_chars)
+    return line_end + 1 if line_end > 0 else max_chars
+
+
+def _chunks(content: str, end: int, chunk_chars: int = SCAN_CHUNK_CHARS) -> Iterable[Tuple[int, int]]:
+    """(start, end) ranges covering content[:end] that no violation match crosses"""
+    start = 0
+    while start < end:
+        boundary = CHUNK_BOUNDARY.search(content, min(start + chunk_chars, end), end) if end - start > chunk_chars else None
+        stop = boundary.end() if boundary is not None else end
+        yield start, stop
+        start = stop
+
+
+def count_long_sentences(content: str) -> int:
+    """Count sentences over LONG_SENTENCE_WORDS words"""
+    return parse_document(content).count_long_sentences(LONG_SENTENCE_WORDS)
+
+
+def count_violations(document: ParsedDocument, end: Optional[int] = None) -> Tuple[Dict[str, int], int, bool]:
+    """
+    Count every style violation in document.text[:end] chunk by chunk, matching
+    per-rule re.findall counts. Also returns how many passive matches use "is"/"was"
+    (the H9 sentence_length check) and whether the time budget ran out first.
+    """
+    content = document.text
+    end = len(content) if end is None else end
+    counts = dict.fromkeys(STYLE_VIOLATIONS, 0)
+    passive_is_was = 0
+    future_end = 0
+
+    for chunk_start, chunk_end in _chunks(content, end):
+        if _out_of_time():
+            return counts, passive_is_was, True
+        for match in VIOLATION_PATTERN.finditer(content, chunk_start, chunk_end):
+            name = match.lastgroup
+            if name == 'future_tense':
+                if match.start() < future_end:
+                    continue  # inside the previous "will <word>", findall would not see it
+                future_end = match.end('future_rest')
+            elif name == 'passive_voice' and match.group('passive_is_was') is not None:
+                passive_is_was += 1
+            counts[name] += 1
+
+    counts['long_sentences'] = document.count_long_sentences(LONG_SENTENCE_WORDS)
+    return counts, passive_is_was, False
+
+
+def scan_parsed(document: ParsedDocument, structure: bool = True) -> Dict[str, Any]:
+    """
+    Run every rule over one parsed text and return all counts. Texts over
+    MAX_SCAN_CHARS are scanned up to the cap; when the scan budget runs out the
+    remaining rules are skipped. Either way 'partial' is set.
+    """
+    end = capped_length(document.text)
+    violations, passive_is_was, timed_out = count_violations(document, end)
+    scan = {
+        'violations': violations,
+        'passive_is_was': passive_is_was,
+        'timed_out': timed_out,
+        'partial': timed_out or end < len(document.text)
+    }
+    if not structure:
+        return scan
+
+    def within_cap(lines) -> bool:
+        return len(lines) > 0 and document.line_starts[lines[0]] < end
+
+    found = set()
+    if within_cap(document.title_lines):
+        found.add('title')
+    if within_cap(document.numbered_step_lines):
+        found.add('numbered_steps')
+
+    content, content_lower = document.text, document.lower
+    if end < len(content):
+        content = content[:end]
+        content_lower = content.lower()
+    if not timed_out and _out_of_time():
+        scan['timed_out'] = scan['partial'] = True
+    if not scan['timed_out']:
+        lowercase_exact = lowercase_is_exact(content)
+        for element, keywords in TEMPLATE_KEYWORDS.items():
+            if keywords.search(content, content_lower, lowercase_exact):
+                found.add(element)
+        if 'troubleshooting' not in found and has_if_then_fail(content):
+            found.add('troubleshooting')
+
+    scan['template_elements'] = found
+    scan['has_heading'] = within_cap(document.heading_lines)
+    scan['gap_keywords'] = {
+        gap_type: any(keyword in content_lower for keyword in keywords)
+        for gap_type, keywords in GAP_RESOLUTION_KEYWORDS.items()
+    }
+    scan['has_step_markers'] = '1.' in content and '2.' in content
+    scan['starts_with_introduction'] = content_lower.startswith(INTRODUCTION_PREFIXES)
+    return scan
+
+
+# Recent scans by (text, structure). A scan cut short by the time budget is
+# only reused within the evaluation (same deadline) that produced it.
+_SCAN_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_SCAN_CACHE_LOCK = threading.Lock()
+SCAN_CACHE_SIZE = 8
+
+
+def scan_document(content: str, structure: bool = True) -> Dict[str, Any]:
+    """
+    Run every rule over one text and return all counts.
+    Cached so each text is scanned once per evaluation however many checks read it.
+    """
+    key = (content, structure)
+    deadline = _DEADLINE.get()
+    with _SCAN_CACHE_LOCK:
+        if key in _SCAN_CACHE:
+            scan, scan_deadline = _SCAN_CACHE[key]
+            if not scan['timed_out'] or scan_deadline == deadline:
+                _SCAN_CACHE.move_to_end(key)
+                return scan
+    scan = scan_parsed(parse_document(content), structure)
+    with _SCAN_CACHE_LOCK:
+        _SCAN_CACHE[key] = (scan, deadline)
+        _SCAN_CACHE.move_to_end(key)
+        while len(_SCAN_CACHE) > SCAN_CACHE_SIZE:
+            _SCAN_CACHE.popitem(last=False)
+    return scan
+
+
+def clear_scan_cache():
+    """Forget cached scans"""
+    with _SCAN_CACHE_LOCK:
+        _SCAN_CACHE.clear()
+
+
+def gap_resolution_checks(scan: Dict[str, Any]) -> Dict[str, bool]:
+    """Whether each H9 gap type counts as resolved in a scanned final output"""
+    keywords = scan['gap_keywords']
+    return {
+        'prerequisites': keywords['prerequisites'],
+        'step_clarity': keywords['step_clarity'],
+        'introduction': scan['starts_with_introduction'],
+        'step_ordering': scan['has_step_markers'],
+        'formatting': scan['has_heading'],  # Headers present
+        'success_criteria': keywords['success_criteria'],
+        'troubleshooting': keywords['troubleshooting'],
+        'passive_voice': scan['violations']['long_sentences'] < 3,
+        'sentence_length': scan['passive_is_was'] < 3
+    }
+
+
+def identify_gaps(analysis_report: str) -> List[str]:
+    """Gap types mentioned in the analysis report, in GAP_INDICATORS order"""
+    report_lower = analysis_report.lower()
+    return [gap_type for indicator, gap_type in GAP_INDICATORS if indicator in report_lower]
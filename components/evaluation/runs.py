@@ -0,0 +1,208 @@
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+import pandas as pd
+
+from components.artifacts import ArtifactStore
+from components.evaluation.store import EVALUATION_COLUMNS, _to_db_value, _typed_frame
+
+# Texts kept for each run -> runs column holding its artifact hash
+RUN_ARTIFACTS = {
+    'original_content': 'original_hash',
+    'analysis_report': 'analysis_hash',
+    'final_output': 'final_hash',
+    'redlined_version': 'redline_hash',
+    'clean_draft': 'clean_draft_hash'
+}
+
+# Score columns kept per (scoring_version, run_id); list fields are stored as JSON text
+SCORE_COLUMNS = {
+    name: sql_type or 'TEXT'
+    for name, sql_type in EVALUATION_COLUMNS.items()
+    if name not in ('scoring_version', 'run_id') and name not in RUN_ARTIFACTS.values()
+}
+
+RUNS_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    user_id TEXT,
+    {', '.join(f'{column} TEXT' for column in RUN_ARTIFACTS.values())}
+);
+CREATE INDEX IF NOT EXISTS idx_runs_timestamp ON runs(timestamp);
+
+-- One score set per scoring version. A row here is also the backfill checkpoint
+-- for that run, so an interrupted backfill resumes where it stopped.
+CREATE TABLE IF NOT EXISTS run_scores (
+    scoring_version INTEGER NOT NULL,
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    scored_at TEXT NOT NULL,
+    {', '.join(f'{name} {sql_type}' for name, sql_type in SCORE_COLUMNS.items())},
+    PRIMARY KEY (scoring_version, run_id)
+) WITHOUT ROWID;
+"""
+
+# Database paths whose schema has already been created by this process
+_INITIALIZED_ARCHIVES = set()
+
+
+def _score_value(column: str, value):
+    """Convert a score value to what SQLite stores for that column"""
+    if column in ('e1_missing_elements', 'e2_remaining_violations'):
+        return value if isinstance(value, str) else json.dumps(value)
+    if hasattr(value, 'item'):
+        value = value.item()  # NumPy scalars from the batch scorer
+    return _to_db_value(column, value)
+
+
+class RunArchive:
+    """
+    Keeps every pipeline run's texts (by artifact hash) plus its scores under
+    each scoring version. Lives in its own SQLite file so backfills never hold
+    locks on the live evaluation store.
+    """
+
+    def __init__(self, db_path: str = "components/data/runs.db", artifacts: Optional[ArtifactStore] = None):
+        self.db_path = db_path
+        self.artifacts = artifacts or ArtifactStore()
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        if os.path.abspath(db_path) not in _INITIALIZED_ARCHIVES:
+            self._migrate_inline_texts()
+            with self._connect() as conn:
+                conn.executescript(RUNS_SCHEMA)
+                # Archives created before a score column was added get it appended
+                existing = {row[1] for row in conn.execute("PRAGMA table_info(run_scores)")}
+                for name, sql_type in SCORE_COLUMNS.items():
+                    if name not in existing:
+                        conn.execute(f"ALTER TABLE run_scores ADD COLUMN {name} {sql_type}")
+            _INITIALIZED_ARCHIVES.add(os.path.abspath(db_path))
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _migrate_inline_texts(self):
+        """Move texts from archives that stored them inline into the artifact store"""
+        if not os.path.exists(self.db_path):
+            return
+        # Foreign keys stay off so rebuilding runs does not cascade into run_scores
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+            if 'original_content' not in columns:
+                return
+            with conn:
+                rows = conn.execute(
+                    "SELECT run_id, timestamp, user_id, original_content, analysis_report, final_output FROM runs"
+                ).fetchall()
+                conn.execute("DROP TABLE runs")
+                conn.executescript(RUNS_SCHEMA)
+                conn.executemany(
+                    "INSERT INTO runs (run_id, timestamp, user_id, original_hash, analysis_hash, final_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (run_id, timestamp, user_id, self.artifacts.put(original),
+                         self.artifacts.put(analysis), self.artifacts.put(final))
+                        for run_id, timestamp, user_id, original, analysis, final in rows
+                    ]
+                )
+        finally:
+            conn.close()
+
+    def save_run(self, run_id: str, timestamp: str, user_id: str, texts: Dict[str, str]) -> Dict[str, str]:
+        """
+        Store one pipeline run. `texts` maps RUN_ARTIFACTS names to their text;
+        returns the hash column -> artifact hash for each stored text.
+        """
+        hashes = {
+            RUN_ARTIFACTS[name]: self.artifacts.put(text)
+            for name, text in texts.items() if text is not None
+        }
+        columns = ['run_id', 'timestamp', 'user_id'] + list(hashes)
+        # An upsert, not INSERT OR REPLACE: a replace deletes the row first, which
+        # cascades to the run's scores for every scoring version
+        updates = ', '.join(f"{column} = excluded.{column}" for column in columns[1:])
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT INTO runs ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+                f"ON CONFLICT(run_id) DO UPDATE SET {updates}",
+                [run_id, timestamp, user_id] + list(hashes.values())
+            )
+        return hashes
+
+    def load_texts(self, run: Dict[str, Any]) -> Dict[str, str]:
+        """Read a run's stored texts back from the artifact store"""
+        return {
+            name: self.artifacts.get(run[column])
+            for name, column in RUN_ARTIFACTS.items() if run.get(column)
+        }
+
+    def save_scores(self, scores: List[Dict[str, Any]]):
+        """Store scores keyed by their run_id and scoring_version, replacing earlier ones"""
+        columns = list(SCORE_COLUMNS)
+        scored_at = datetime.now().isoformat()
+        with self._connect() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO run_scores (scoring_version, run_id, scored_at, {', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in range(len(columns) + 3))})",
+                [
+                    [int(score['scoring_version']), score['run_id'], scored_at] +
+                    [_score_value(column, score.get(column)) for column in columns]
+                    for score in scores
+                ]
+            )
+
+    def pending_runs(self, scoring_version: int, after: str = '', limit: int = 100) -> List[Dict[str, Any]]:
+        """Runs (with their artifact hashes) without scores for this version, in run_id order after `after`"""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(f"""
+                SELECT run_id, timestamp, user_id, {', '.join(RUN_ARTIFACTS.values())}
+                FROM runs
+                WHERE run_id > ? AND NOT EXISTS (
+                    SELECT 1 FROM run_scores s WHERE s.scoring_version = ? AND s.run_id = runs.run_id
+                )
+                ORDER BY run_id LIMIT ?
+            """, (after, scoring_version, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def count_pending(self, scoring_version: int) -> int:
+        """Number of runs without scores for this version"""
+        with self._connect() as conn:
+            return conn.execute("""
+                SELECT COUNT(*) FROM runs
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM run_scores s WHERE s.scoring_version = ? AND s.run_id = runs.run_id
+                )
+            """, (scoring_version,)).fetchone()[0]
+
+    def scores(self, scoring_version: int, limit: Optional[int] = None) -> pd.DataFrame:
+        """Scores for one version, oldest run first"""
+        sql = f"SELECT run_id, {', '.join(SCORE_COLUMNS)} FROM run_scores WHERE scoring_version = ? ORDER BY timestamp"
+        params = [scoring_version]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._connect() as conn:
+            return _typed_frame(pd.read_sql_query(sql, conn, params=params))
+
+    def versions(self) -> pd.DataFrame:
+        """Per scoring version: runs scored, average overall score and pass rate"""
+        with self._connect() as conn:
+            return pd.read_sql_query("""
+                SELECT scoring_version, COUNT(*) AS runs, AVG(overall_score) AS avg_overall_score,
+                       AVG(overall_pass) * 100 AS overall_pass_rate
+                FROM run_scores GROUP BY scoring_version ORDER BY scoring_version
+            """, conn)
@@ -0,0 +1,844 @@
+import csv
+import io
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+import pandas as pd
+
+from components.evaluation.sketch import QuantileSketch, percentile_row
+from components.evaluation.summary import EVALUATIONS_DB, EMPTY_SUMMARY, AGGREGATE_METRICS, read_summary
+
+# Column name -> SQLite type for the evaluations table. The order matches the
+# CSV header written by the original CSV backend.
+EVALUATION_COLUMNS = {
+    'timestamp': 'TEXT NOT NULL',
+    'user_id': 'TEXT',
+    'original_word_count': 'INTEGER',
+    'final_word_count': 'INTEGER',
+    'processing_successful': 'INTEGER',
+    'e1_template_compliance_rate': 'REAL',
+    'e1_template_score': 'INTEGER',
+    'e1_template_pass': 'INTEGER',
+    'e1_missing_elements': None,  # stored in evaluation_missing_elements
+    'e2_violation_reduction_rate': 'REAL',
+    'e2_style_precision': 'REAL',
+    'e2_style_score': 'INTEGER',
+    'e2_style_pass': 'INTEGER',
+    'e2_remaining_violations': None,  # stored in evaluation_violations
+    'h9_gap_resolution_score': 'INTEGER',
+    'h9_pass': 'INTEGER',
+    'h9_gaps_fixed': 'TEXT',
+    'overall_pass': 'INTEGER',
+    'overall_score': 'REAL',
+    'scoring_version': 'INTEGER',
+    'scan_partial': 'INTEGER',  # input cap or time budget cut the rule scan short
+    # Seconds spent in each pipeline phase
+    'analysis_seconds': 'REAL',
+    'style_seconds': 'REAL',
+    'scoring_seconds': 'REAL',
+    'run_id': 'TEXT',  # run in the run archive, when kept
+    # Artifact store hashes of the texts this row scored
+    'original_hash': 'TEXT',
+    'analysis_hash': 'TEXT',
+    'final_hash': 'TEXT'
+}
+
+BOOLEAN_COLUMNS = ['processing_successful', 'e1_template_pass', 'e2_style_pass', 'h9_pass', 'overall_pass',
+                   'scan_partial']
+
+# Dashboard "Show:" filter -> SQL predicate
+FAILURE_FILTERS = {
+    'all': None,
+    'failed': 'overall_pass = 0',
+    'template': 'e1_template_pass = 0',
+    'style': 'e2_style_pass = 0'
+}
+
+SCALAR_COLUMNS = [name for name, sql_type in EVALUATION_COLUMNS.items() if sql_type]
+
+# Trend rollup granularities: name -> (length of the ISO timestamp prefix naming a bucket, its format)
+ROLLUP_GRANULARITIES = {
+    'hour': (13, '%Y-%m-%dT%H'),
+    'day': (10, '%Y-%m-%d')
+}
+
+# Metrics rolled up per time bucket: score column -> pass flag counted for its pass rate
+ROLLUP_METRICS = {
+    'e1_template_score': 'e1_template_pass',
+    'e2_style_score': 'e2_style_pass',
+    'h9_gap_resolution_score': 'h9_pass',
+    'overall_score': 'overall_pass'
+}
+
+ROLLUP_COLUMNS = ['bucket', 'metric', 'count', 'total', 'min', 'max', 'passed']
+
+# Distributions kept as quantile sketches per time bucket; word_count_delta is
+# final_word_count - original_word_count, the rest are evaluation columns
+SKETCH_METRICS = ['overall_score', 'word_count_delta', 'analysis_seconds', 'style_seconds', 'scoring_seconds']
+
+# Sketch granularities: the rollup ones plus a single all-time bucket
+SKETCH_GRANULARITIES = list(ROLLUP_GRANULARITIES) + ['all']
+
+# Windows up to this many days merge hourly sketches; longer ones merge daily sketches
+HOURLY_SKETCH_DAYS = 7
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS evaluations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    {', '.join(f'{name} {sql_type}' for name, sql_type in EVALUATION_COLUMNS.items() if sql_type)}
+);
+CREATE INDEX IF NOT EXISTS idx_evaluations_timestamp ON evaluations(timestamp);
+CREATE INDEX IF NOT EXISTS idx_evaluations_user ON evaluations(user_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_evaluations_overall_pass ON evaluations(overall_pass, timestamp);
+CREATE INDEX IF NOT EXISTS idx_evaluations_template_pass ON evaluations(e1_template_pass, timestamp);
+CREATE INDEX IF NOT EXISTS idx_evaluations_style_pass ON evaluations(e2_style_pass, timestamp);
+CREATE INDEX IF NOT EXISTS idx_evaluations_gap_pass ON evaluations(h9_pass, timestamp);
+
+CREATE TABLE IF NOT EXISTS evaluation_missing_elements (
+    evaluation_id INTEGER NOT NULL REFERENCES evaluations(id) ON DELETE CASCADE,
+    element TEXT NOT NULL,
+    PRIMARY KEY (evaluation_id, element)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_missing_elements_element ON evaluation_missing_elements(element);
+
+CREATE TABLE IF NOT EXISTS evaluation_violations (
+    evaluation_id INTEGER NOT NULL REFERENCES evaluations(id) ON DELETE CASCADE,
+    violation_type TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (evaluation_id, violation_type)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_violations_type ON evaluation_violations(violation_type);
+
+-- Running aggregates, updated in the same transaction as each insert
+CREATE TABLE IF NOT EXISTS evaluation_aggregates (
+    metric TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0,
+    total REAL NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS evaluation_element_totals (
+    element TEXT PRIMARY KEY,
+    missing_count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS evaluation_violation_totals (
+    violation_type TEXT PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0
+);
+
+-- Per time bucket and metric, updated in the same transaction as each insert
+CREATE TABLE IF NOT EXISTS evaluation_rollups (
+    granularity TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    min REAL,
+    max REAL,
+    passed INTEGER NOT NULL,
+    PRIMARY KEY (granularity, bucket, metric)
+) WITHOUT ROWID;
+
+-- Quantile sketch (JSON) per time bucket and metric, updated with each saved batch
+CREATE TABLE IF NOT EXISTS evaluation_sketches (
+    granularity TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    sketch TEXT NOT NULL,
+    PRIMARY KEY (granularity, bucket, metric)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS store_metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _decode_list_field(value, default):
+    """Decode a JSON-encoded list/dict field, passing through already decoded values"""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return default
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return default
+    return value
+
+
+def _to_db_value(column: str, value):
+    """Convert a result value to what SQLite stores for that column"""
+    if value is None or value == '' or (isinstance(value, float) and pd.isna(value)):
+        return None
+    if column in BOOLEAN_COLUMNS:
+        if isinstance(value, str):
+            return 1 if value.strip().lower() == 'true' else 0
+        return 1 if value else 0
+    if isinstance(value, str) and EVALUATION_COLUMNS[column] in ('INTEGER', 'REAL'):
+        return float(value) if EVALUATION_COLUMNS[column] == 'REAL' else int(float(value))
+    return value
+
+
+# Database paths whose schema has already been created by this process
+_INITIALIZED_DATABASES = set()
+
+
+def _bucket_key(timestamp, granularity: str) -> str:
+    """Rollup bucket of an ISO timestamp, e.g. '2024-05-01T13' for its hour"""
+    if granularity == 'all':
+        return ''
+    length, _ = ROLLUP_GRANULARITIES[granularity]
+    return str(timestamp)[:length].replace(' ', 'T')
+
+
+def _finish_rollups(df: pd.DataFrame, granularity: str) -> pd.DataFrame:
+    """Parse bucket keys and add mean and pass rate (%) to raw rollup rows"""
+    df = df.reindex(columns=ROLLUP_COLUMNS)
+    df['bucket'] = pd.to_datetime(df['bucket'], format=ROLLUP_GRANULARITIES[granularity][1], errors='coerce')
+    counts = df['count'].astype(float)
+    df['mean'] = df['total'] / counts
+    df['pass_rate'] = df['passed'] / counts * 100
+    return df.sort_values(['bucket', 'metric'], ignore_index=True)
+
+
+def rollup_frame(df: pd.DataFrame, granularity: str) -> pd.DataFrame:
+    """Roll typed evaluation rows up into time buckets, for stores without rollup tables"""
+    if df.empty:
+        return _finish_rollups(pd.DataFrame(columns=ROLLUP_COLUMNS), granularity)
+    buckets = df['timestamp'].dt.strftime(ROLLUP_GRANULARITIES[granularity][1])
+    frames = []
+    for metric, flag in ROLLUP_METRICS.items():
+        values = pd.DataFrame({
+            'bucket': buckets,
+            'value': pd.to_numeric(df[metric], errors='coerce'),
+            'passed': df[flag].astype(int)
+        }).dropna()
+        grouped = values.groupby('bucket').agg(
+            count=('value', 'size'), total=('value', 'sum'), min=('value', 'min'),
+            max=('value', 'max'), passed=('passed', 'sum')
+        ).reset_index()
+        grouped['metric'] = metric
+        frames.append(grouped)
+    return _finish_rollups(pd.concat(frames, ignore_index=True), granularity)
+
+
+def sketch_values(df: pd.DataFrame) -> pd.DataFrame:
+    """Long (timestamp, metric, value) rows of the sketched metrics of evaluation rows"""
+    def numeric(column):
+        if column not in df.columns:
+            return pd.Series(float('nan'), index=df.index)
+        return pd.to_numeric(df[column], errors='coerce')
+
+    wide = pd.DataFrame({
+        metric: numeric('final_word_count') - numeric('original_word_count')
+        if metric == 'word_count_delta' else numeric(metric)
+        for metric in SKETCH_METRICS
+    })
+    wide['timestamp'] = df['timestamp'].astype(str) if 'timestamp' in df.columns else ''
+    return wide.melt(id_vars='timestamp', var_name='metric', value_name='value').dropna(subset=['value'])
+
+
+def percentile_frame(df: pd.DataFrame, percentiles=DEFAULT_PERCENTILES) -> pd.DataFrame:
+    """Exact percentiles of the sketched metrics, for stores without sketch tables"""
+    values = sketch_values(df) if not df.empty else pd.DataFrame(columns=['metric', 'value'])
+    rows = []
+    for metric in SKETCH_METRICS:
+        metric_values = values.loc[values['metric'] == metric, 'value'].astype(float)
+        row = {'metric': metric, 'count': len(metric_values),
+               'min': metric_values.min() if len(metric_values) else None,
+               'max': metric_values.max() if len(metric_values) else None}
+        for p in percentiles:
+            row[f'p{p}'] = metric_values.quantile(p / 100, interpolation='higher') if len(metric_values) else None
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def _typed_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce stored evaluation rows to the types the dashboard reads"""
+    if df.empty:
+        return df
+    for column, sql_type in EVALUATION_COLUMNS.items():
+        if column not in df.columns:
+            # Rows written before the column existed: evolve rather than fail
+            df[column] = None
+        if column in BOOLEAN_COLUMNS:
+            df[column] = df[column].map(lambda value: bool(_to_db_value(column, value))).astype(bool)
+        elif sql_type in ('INTEGER', 'REAL'):
+            df[column] = pd.to_numeric(df[column], errors='coerce')
+    if 'e1_missing_elements' in df.columns:
+        df['e1_missing_elements'] = [_decode_list_field(value, []) for value in df['e1_missing_elements']]
+    if 'e2_remaining_violations' in df.columns:
+        df['e2_remaining_violations'] = [_decode_list_field(value, {}) for value in df['e2_remaining_violations']]
+    df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+    return df
+
+
+def tail_csv_rows(path: str, limit: int, block_size: int = 64 * 1024) -> pd.DataFrame:
+    """Read only the last `limit` records of a CSV log by scanning blocks backwards from the end"""
+    with open(path, 'rb') as f:
+        header = f.readline()
+        data_start = f.tell()
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+
+        tail = b''
+        # limit + 1 newlines guarantee `limit` complete records after the first partial line
+        while position > data_start and tail.count(b'\n') <= limit:
+            read_size = min(block_size, position - data_start)
+            position -= read_size
+            f.seek(position)
+            tail = f.read(read_size) + tail
+
+    lines = tail.splitlines()
+    if position > data_start:
+        lines = lines[1:]  # first line may start mid-record
+    lines = [line for line in lines if line.strip()][-limit:] if limit > 0 else []
+
+    text = (header + b'\n'.join(lines)).decode('utf-8')
+    rows = list(csv.DictReader(io.StringIO(text)))
+    return pd.DataFrame(rows, columns=next(csv.reader([header.decode('utf-8')]), []))
+
+
+class EvaluationStore:
+    """SQLite-backed evaluation storage with indexed queries for the dashboard"""
+
+    def __init__(self, db_path: str = EVALUATIONS_DB,
+                 legacy_csv: Optional[str] = "components/data/evaluations.csv"):
+        self.db_path = db_path
+        self.legacy_csv = legacy_csv
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        if os.path.abspath(db_path) not in _INITIALIZED_DATABASES:
+            self._initialize()
+            _INITIALIZED_DATABASES.add(os.path.abspath(db_path))
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _initialize(self):
+        """Create the schema, build the running aggregates and import the legacy CSV history once"""
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            # Hold the write lock while checking so concurrent server processes
+            # do not migrate or import the same history twice
+            conn.execute("BEGIN IMMEDIATE")
+            # Databases created before a column was added get it appended
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(evaluations)")}
+            for name in SCALAR_COLUMNS:
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE evaluations ADD COLUMN {name} {EVALUATION_COLUMNS[name]}")
+            # Lets replayed saves of the same run be ignored
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_evaluations_run ON evaluations(run_id)")
+            if conn.execute(
+                "SELECT value FROM store_metadata WHERE key = 'aggregates_built'"
+            ).fetchone() is None:
+                self._rebuild_aggregates(conn)
+                conn.execute(
+                    "INSERT INTO store_metadata (key, value) VALUES ('aggregates_built', ?)",
+                    (datetime.now().isoformat(),)
+                )
+            if conn.execute(
+                "SELECT value FROM store_metadata WHERE key = 'rollups_built'"
+            ).fetchone() is None:
+                self._rebuild_rollups(conn)
+                conn.execute(
+                    "INSERT INTO store_metadata (key, value) VALUES ('rollups_built', ?)",
+                    (datetime.now().isoformat(),)
+                )
+            if conn.execute(
+                "SELECT value FROM store_metadata WHERE key = 'sketches_built'"
+            ).fetchone() is None:
+                self._rebuild_sketches(conn)
+                conn.execute(
+                    "INSERT INTO store_metadata (key, value) VALUES ('sketches_built', ?)",
+                    (datetime.now().isoformat(),)
+                )
+            imported = conn.execute(
+                "SELECT value FROM store_metadata WHERE key = 'legacy_csv_imported'"
+            ).fetchone()
+            if imported is None:
+                if self.legacy_csv and os.path.exists(self.legacy_csv):
+                    with open(self.legacy_csv, newline='', encoding='utf-8') as f:
+                        rows = [row for row in csv.DictReader(f) if self._insert(conn, row) is not None]
+                    self._update_sketches(conn, rows)
+                conn.execute(
+                    "INSERT INTO store_metadata (key, value) VALUES ('legacy_csv_imported', ?)",
+                    (datetime.now().isoformat(),)
+                )
+
+    def _insert(self, conn: sqlite3.Connection, results: Dict[str, Any]) -> Optional[int]:
+        """Insert one evaluation row plus its normalized child rows; None if its run is already stored"""
+        columns = [col for col in SCALAR_COLUMNS if col in results]
+        cursor = conn.execute(
+            f"INSERT OR IGNORE INTO evaluations ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+            [_to_db_value(col, results[col]) for col in columns]
+        )
+        if cursor.rowcount == 0:
+            return None
+        evaluation_id = cursor.lastrowid
+
+        missing_elements = _decode_list_field(results.get('e1_missing_elements'), [])
+        conn.executemany(
+            "INSERT OR IGNORE INTO evaluation_missing_elements (evaluation_id, element) VALUES (?, ?)",
+            [(evaluation_id, element) for element in missing_elements]
+        )
+
+        remaining_violations = _decode_list_field(results.get('e2_remaining_violations'), {})
+        conn.executemany(
+            "INSERT INTO evaluation_violations (evaluation_id, violation_type, count) VALUES (?, ?, ?)",
+            [(evaluation_id, violation_type, int(count)) for violation_type, count in remaining_violations.items()]
+        )
+
+        self._update_aggregates(conn, results, missing_elements, remaining_violations)
+        self._update_rollups(conn, results)
+        return evaluation_id
+
+    def _update_aggregates(self, conn: sqlite3.Connection, results: Dict[str, Any],
+                           missing_elements: List[str], remaining_violations: Dict[str, int]):
+        """Fold one evaluation into the running aggregates"""
+        increments = [('evaluations', 1, 1)]
+        for column, _ in AGGREGATE_METRICS.values():
+            value = _to_db_value(column, results.get(column))
+            if value is not None:
+                increments.append((column, 1, value))
+        conn.executemany("""
+            INSERT INTO evaluation_aggregates (metric, count, total) VALUES (?, ?, ?)
+            ON CONFLICT(metric) DO UPDATE SET count = count + excluded.count, total = total + excluded.total
+        """, increments)
+        conn.executemany("""
+            INSERT INTO evaluation_element_totals (element, missing_count) VALUES (?, 1)
+            ON CONFLICT(element) DO UPDATE SET missing_count = missing_count + 1
+        """, [(element,) for element in set(missing_elements)])
+        conn.executemany("""
+            INSERT INTO evaluation_violation_totals (violation_type, total) VALUES (?, ?)
+            ON CONFLICT(violation_type) DO UPDATE SET total = total + excluded.total
+        """, [(violation_type, int(count)) for violation_type, count in remaining_violations.items()])
+
+    def _update_rollups(self, conn: sqlite3.Connection, results: Dict[str, Any]):
+        """Fold one evaluation into its hourly and daily trend buckets"""
+        rows = []
+        for metric, flag in ROLLUP_METRICS.items():
+            value = _to_db_value(metric, results.get(metric))
+            if value is None:
+                continue
+            passed = _to_db_value(flag, results.get(flag)) or 0
+            for granularity in ROLLUP_GRANULARITIES:
+                rows.append((granularity, _bucket_key(results['timestamp'], granularity), metric,
+                             value, value, value, passed))
+        conn.executemany("""
+            INSERT INTO evaluation_rollups (granularity, bucket, metric, count, total, min, max, passed)
+            VALUES (?, ?, ?, 1, ?, ?, ?, ?)
+            ON CONFLICT(granularity, bucket, metric) DO UPDATE SET
+                count = count + 1, total = total + excluded.total, min = MIN(min, excluded.min),
+                max = MAX(max, excluded.max), passed = passed + excluded.passed
+        """, rows)
+
+    def _rebuild_rollups(self, conn: sqlite3.Connection):
+        """Recompute the trend rollups from the stored rows"""
+        conn.execute("DELETE FROM evaluation_rollups")
+        for granularity, (length, _) in ROLLUP_GRANULARITIES.items():
+            for metric, flag in ROLLUP_METRICS.items():
+                conn.execute(f"""
+                    INSERT INTO evaluation_rollups (granularity, bucket, metric, count, total, min, max, passed)
+                    SELECT ?, replace(substr(timestamp, 1, {length}), ' ', 'T'), ?, COUNT(*), SUM({metric}),
+                           MIN({metric}), MAX({metric}), COALESCE(SUM({flag}), 0)
+                    FROM evaluations WHERE {metric} IS NOT NULL
+                    GROUP BY replace(substr(timestamp, 1, {length}), ' ', 'T')
+                """, (granularity, metric))
+
+    def _update_sketches(self, conn: sqlite3.Connection, results: List[Dict[str, Any]]):
+        """Fold a batch of saved evaluations into their quantile sketches, touching each bucket once"""
+        grouped = {}
+        for row in results:
+            original = _to_db_value('original_word_count', row.get('original_word_count'))
+            final = _to_db_value('final_word_count', row.get('final_word_count'))
+            for metric in SKETCH_METRICS:
+                if metric == 'word_count_delta':
+                    value = final - original if original is not None and final is not None else None
+                else:
+                    value = _to_db_value(metric, row.get(metric))
+                if value is None:
+                    continue
+                for granularity in SKETCH_GRANULARITIES:
+                    key = (granularity, _bucket_key(row['timestamp'], granularity), metric)
+                    grouped.setdefault(key, []).append(value)
+        self._write_sketches(conn, grouped)
+
+    def _write_sketches(self, conn: sqlite3.Connection, grouped: Dict[tuple, List[float]]):
+        """Add values to the stored sketches: (granularity, bucket, metric) -> values"""
+        for (granularity, bucket, metric), values in grouped.items():
+            row = conn.execute(
+                "SELECT sketch FROM evaluation_sketches WHERE granularity = ? AND bucket = ? AND metric = ?",
+                (granularity, bucket, metric)
+            ).fetchone()
+            sketch = QuantileSketch.from_json(row[0]) if row else QuantileSketch()
+            sketch.update_many(values)
+            conn.execute(
+                "INSERT OR REPLACE INTO evaluation_sketches (granularity, bucket, metric, sketch) VALUES (?, ?, ?, ?)",
+                (granularity, bucket, metric, sketch.to_json())
+            )
+
+    def _rebuild_sketches(self, conn: sqlite3.Connection):
+        """Recompute the quantile sketches from the stored rows"""
+        conn.execute("DELETE FROM evaluation_sketches")
+        columns = ['timestamp', 'original_word_count', 'final_word_count'] + [
+            metric for metric in SKETCH_METRICS if metric in EVALUATION_COLUMNS
+        ]
+        for chunk in pd.read_sql_query(f"SELECT {', '.join(columns)} FROM evaluations", conn, chunksize=50000):
+            values = sketch_values(chunk)
+            for granularity in SKETCH_GRANULARITIES:
+                if granularity == 'all':
+                    buckets = pd.Series('', index=values.index)
+                else:
+                    buckets = values['timestamp'].str[:ROLLUP_GRANULARITIES[granularity][0]].str.replace(' ', 'T')
+                self._write_sketches(conn, {
+                    (granularity, bucket, metric): group.tolist()
+                    for (bucket, metric), group in values['value'].groupby([buckets, values['metric']])
+                })
+
+    def _rebuild_aggregates(self, conn: sqlite3.Connection):
+        """Recompute the running aggregates from the stored rows"""
+        conn.execute("DELETE FROM evaluation_aggregates")
+        conn.execute("DELETE FROM evaluation_element_totals")
+        conn.execute("DELETE FROM evaluation_violation_totals")
+        conn.execute(
+            "INSERT INTO evaluation_aggregates (metric, count, total) SELECT 'evaluations', COUNT(*), COUNT(*) FROM evaluations"
+        )
+        for column, _ in AGGREGATE_METRICS.values():
+            conn.execute(
+                f"INSERT OR REPLACE INTO evaluation_aggregates (metric, count, total) "
+                f"SELECT ?, COUNT({column}), COALESCE(SUM({column}), 0) FROM evaluations",
+                (column,)
+            )
+        conn.execute("""
+            INSERT INTO evaluation_element_totals (element, missing_count)
+            SELECT element, COUNT(*) FROM evaluation_missing_elements GROUP BY element
+        """)
+        conn.execute("""
+            INSERT INTO evaluation_violation_totals (violation_type, total)
+            SELECT violation_type, SUM(count) FROM evaluation_violations GROUP BY violation_type
+        """)
+
+    def save(self, results: Dict[str, Any]) -> Optional[int]:
+        """Save one evaluation and return its row id"""
+        return self.save_many([results])[0]
+
+    def save_many(self, results: List[Dict[str, Any]]) -> List[Optional[int]]:
+        """Save a batch of evaluations in one transaction"""
+        with self._connect() as conn:
+            ids = [self._insert(conn, row) for row in results]
+            self._update_sketches(conn, [row for row, row_id in zip(results, ids) if row_id is not None])
+            return ids
+
+    def _frame(self, conn: sqlite3.Connection, where: List[str], params: List[Any], limit: int) -> pd.DataFrame:
+        """Run a filtered query for the newest rows and return them oldest-first"""
+        sql = f"SELECT id, {', '.join(SCALAR_COLUMNS)} FROM evaluations"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        df = pd.read_sql_query(sql, conn, params=params + [limit])
+        df = df.iloc[::-1].reset_index(drop=True)
+        if df.empty:
+            return df
+
+        ids = [int(i) for i in df['id']]
+        placeholders = ', '.join('?' for _ in ids)
+        missing = {i: [] for i in ids}
+        for evaluation_id, element in conn.execute(
+            f"SELECT evaluation_id, element FROM evaluation_missing_elements WHERE evaluation_id IN ({placeholders})",
+            ids
+        ):
+            missing[evaluation_id].append(element)
+        violations = {i: {} for i in ids}
+        for evaluation_id, violation_type, count in conn.execute(
+            f"SELECT evaluation_id, violation_type, count FROM evaluation_violations WHERE evaluation_id IN ({placeholders})",
+            ids
+        ):
+            violations[evaluation_id][violation_type] = count
+
+        df['e1_missing_elements'] = [missing[i] for i in ids]
+        df['e2_remaining_violations'] = [violations[i] for i in ids]
+        return _typed_frame(df)
+
+    def recent(self, limit: int = 10) -> pd.DataFrame:
+        """Get the most recent evaluations, oldest first, walking the timestamp index backwards"""
+        with self._connect() as conn:
+            return self._frame(conn, [], [], limit)
+
+    def _filters(self, show: str, days: Optional[int], min_score: Optional[float]) -> Tuple[List[str], List[Any]]:
+        """SQL predicates and parameters for the dashboard filters"""
+        where, params = [], []
+        if FAILURE_FILTERS.get(show):
+            where.append(FAILURE_FILTERS[show])
+        if min_score is not None:
+            where.append("overall_score >= ?")
+            params.append(min_score)
+        if days is not None:
+            where.append("timestamp >= ?")
+            params.append((datetime.now() - timedelta(days=days)).isoformat())
+        return where, params
+
+    def query(self, show: str = 'all', days: Optional[int] = None,
+              min_score: Optional[float] = None, limit: int = 20) -> pd.DataFrame:
+        """Filter evaluations in SQL and return the newest matching rows"""
+        where, params = self._filters(show, days, min_score)
+        with self._connect() as conn:
+            return self._frame(conn, where, params, limit)
+
+    def page(self, show: str = 'all', days: Optional[int] = None, min_score: Optional[float] = None,
+             page_size: int = 50, cursor: Optional[int] = None) -> Dict[str, Any]:
+        """
+        One page of matching evaluations, newest first, plus the total match count.
+        `cursor` is the previous page's next_cursor (the id of its last row), so
+        every page is an index seek from that row rather than an OFFSET scan.
+        """
+        where, params = self._filters(show, days, min_score)
+        with self._connect() as conn:
+            total = conn.execute(
+                "SELECT COUNT(*) FROM evaluations" + (" WHERE " + " AND ".join(where) if where else ""), params
+            ).fetchone()[0]
+            if cursor is not None:
+                where = where + [
+                    "timestamp <= (SELECT timestamp FROM evaluations WHERE id = ?)",
+                    "(timestamp < (SELECT timestamp FROM evaluations WHERE id = ?) OR id < ?)"
+                ]
+                params = params + [cursor, cursor, cursor]
+            rows = self._frame(conn, where, params, page_size + 1).iloc[::-1].reset_index(drop=True)
+        next_cursor = int(rows['id'].iloc[page_size - 1]) if len(rows) > page_size else None
+        return {'rows': rows.iloc[:page_size], 'total': total, 'next_cursor': next_cursor}
+
+    def history(self, after_id: int = 0) -> pd.DataFrame:
+        """Every evaluation with a row id above after_id, oldest first, including the id"""
+        with self._connect() as conn:
+            df = pd.read_sql_query(
+                f"SELECT id, {', '.join(SCALAR_COLUMNS)} FROM evaluations WHERE id > ? ORDER BY timestamp, id",
+                conn, params=[after_id]
+            )
+            if df.empty:
+                return df
+            missing = {}
+            for evaluation_id, element in conn.execute(
+                "SELECT evaluation_id, element FROM evaluation_missing_elements WHERE evaluation_id > ?", (after_id,)
+            ):
+                missing.setdefault(evaluation_id, []).append(element)
+            violations = {}
+            for evaluation_id, violation_type, count in conn.execute(
+                "SELECT evaluation_id, violation_type, count FROM evaluation_violations WHERE evaluation_id > ?",
+                (after_id,)
+            ):
+                violations.setdefault(evaluation_id, {})[violation_type] = count
+
+        ids = [int(i) for i in df['id']]
+        df['e1_missing_elements'] = [missing.get(i, []) for i in ids]
+        df['e2_remaining_violations'] = [violations.get(i, {}) for i in ids]
+        return _typed_frame(df)
+
+    def rollups(self, granularity: str = 'day', since: Optional[datetime] = None) -> pd.DataFrame:
+        """Pre-computed trend buckets (count, total, min, max, passed, mean, pass_rate per metric)"""
+        sql = f"SELECT {', '.join(ROLLUP_COLUMNS)} FROM evaluation_rollups WHERE granularity = ?"
+        params = [granularity]
+        if since is not None:
+            sql += " AND bucket >= ?"
+            params.append(_bucket_key(since.isoformat(), granularity))
+        with self._connect() as conn:
+            df = pd.read_sql_query(sql + " ORDER BY bucket", conn, params=params)
+        return _finish_rollups(df, granularity)
+
+    def percentiles(self, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                    percentiles=DEFAULT_PERCENTILES) -> pd.DataFrame:
+        """
+        count, min, max and pNN per sketched metric over a window, merged from the
+        stored sketches. Windows are widened to whole buckets: hours for up to
+        HOURLY_SKETCH_DAYS days back, days before that.
+        """
+        if since is None and until is None:
+            granularity = 'all'
+        elif since is not None and since >= datetime.now() - timedelta(days=HOURLY_SKETCH_DAYS):
+            granularity = 'hour'
+        else:
+            granularity = 'day'
+        sql = "SELECT metric, sketch FROM evaluation_sketches WHERE granularity = ?"
+        params = [granularity]
+        if since is not None:
+            sql += " AND bucket >= ?"
+            params.append(_bucket_key(since.isoformat(), granularity))
+        if until is not None:
+            sql += " AND bucket <= ?"
+            params.append(_bucket_key(until.isoformat(), granularity))
+
+        merged = {metric: QuantileSketch() for metric in SKETCH_METRICS}
+        with self._connect() as conn:
+            for metric, sketch in conn.execute(sql, params):
+                if metric in merged:
+                    merged[metric].merge(QuantileSketch.from_json(sketch))
+        return pd.DataFrame([
+            {'metric': metric, **percentile_row(sketch, percentiles)} for metric, sketch in merged.items()
+        ])
+
+    def version(self) -> int:
+        """Highest row id ever assigned; changes whenever an evaluation is saved"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'evaluations'").fetchone()
+        return row[0] if row else 0
+
+    def summary(self) -> Dict[str, Any]:
+        """Read summary statistics from the running aggregates"""
+        with self._connect() as conn:
+            return read_summary(conn)
+
+
+class CSVEvaluationStore:
+    """Legacy CSV storage that rewrites the whole file on every save"""
+
+    def __init__(self, evaluation_file: str = "components/data/evaluations.csv"):
+        self.evaluation_file = evaluation_file
+
+    def save(self, results: Dict[str, Any]):
+        """Save evaluation results to CSV"""
+        if os.path.exists(self.evaluation_file):
+            df = pd.read_csv(self.evaluation_file)
+            # Convert results to DataFrame and concatenate
+            new_row = pd.DataFrame([results])
+            df = pd.concat([df, new_row], ignore_index=True)
+        else:
+            df = pd.DataFrame([results])
+
+        df.to_csv(self.evaluation_file, index=False)
+
+    def save_many(self, results: List[Dict[str, Any]]):
+        """Save a batch of evaluations with a single rewrite, skipping runs already saved"""
+        new_rows = pd.DataFrame(results)
+        if os.path.exists(self.evaluation_file):
+            df = pd.read_csv(self.evaluation_file)
+            if 'run_id' in df.columns and 'run_id' in new_rows.columns:
+                new_rows = new_rows[~new_rows['run_id'].isin(df['run_id'].dropna())]
+            df = pd.concat([df, new_rows], ignore_index=True)
+        else:
+            df = new_rows
+        if 'run_id' in df.columns:
+            df = df[df['run_id'].isna() | ~df['run_id'].duplicated()]
+
+        df.to_csv(self.evaluation_file, index=False)
+
+    def _load(self) -> pd.DataFrame:
+        if os.path.exists(self.evaluation_file):
+            return pd.read_csv(self.evaluation_file)
+        return pd.DataFrame()
+
+    def recent(self, limit: int = 10) -> pd.DataFrame:
+        """Get recent evaluation results without loading the full history"""
+        if not os.path.exists(self.evaluation_file):
+            return pd.DataFrame()
+        return _typed_frame(tail_csv_rows(self.evaluation_file, limit))
+
+    def _filtered(self, show: str, days: Optional[int], min_score: Optional[float]) -> pd.DataFrame:
+        df = self._load()
+        if df.empty:
+            return df
+        if show == 'failed':
+            df = df[df['overall_pass'] == False]
+        elif show == 'template':
+            df = df[df['e1_template_pass'] == False]
+        elif show == 'style':
+            df = df[df['e2_style_pass'] == False]
+        if min_score is not None and 'overall_score' in df.columns:
+            df = df[df['overall_score'] >= min_score]
+        if days is not None:
+            cutoff_date = datetime.now() - timedelta(days=days)
+            df = df[pd.to_datetime(df['timestamp']) >= cutoff_date]
+        return df
+
+    def query(self, show: str = 'all', days: Optional[int] = None,
+              min_score: Optional[float] = None, limit: int = 20) -> pd.DataFrame:
+        """Filter the full CSV in memory"""
+        return self._filtered(show, days, min_score).tail(limit)
+
+    def page(self, show: str = 'all', days: Optional[int] = None, min_score: Optional[float] = None,
+             page_size: int = 50, cursor: Optional[int] = None) -> Dict[str, Any]:
+        """One page of matching evaluations, newest first; `cursor` is the number of rows on earlier pages"""
+        df = self._filtered(show, days, min_score)
+        offset = cursor or 0
+        rows = _typed_frame(df.iloc[::-1].iloc[offset:offset + page_size].reset_index(drop=True))
+        next_cursor = offset + page_size if len(df) > offset + page_size else None
+        return {'rows': rows, 'total': len(df), 'next_cursor': next_cursor}
+
+    def history(self) -> pd.DataFrame:
+        """Every evaluation, oldest first"""
+        return _typed_frame(self._load())
+
+    def rollups(self, granularity: str = 'day', since: Optional[datetime] = None) -> pd.DataFrame:
+        """Trend buckets computed from the full CSV"""
+        df = self.history()
+        if since is not None and not df.empty:
+            df = df[df['timestamp'] >= since]
+        return rollup_frame(df, granularity)
+
+    def percentiles(self, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                    percentiles=DEFAULT_PERCENTILES) -> pd.DataFrame:
+        """Exact percentiles computed from the full CSV"""
+        df = self.history()
+        if not df.empty:
+            if since is not None:
+                df = df[df['timestamp'] >= since]
+            if until is not None:
+                df = df[df['timestamp'] <= until]
+        return percentile_frame(df, percentiles)
+
+    def version(self) -> Optional[tuple]:
+        """File modification time and size; changes whenever the file is rewritten"""
+        try:
+            stat = os.stat(self.evaluation_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def summary(self) -> Dict[str, Any]:
+        """Get summary statistics of all evaluations"""
+        if not os.path.exists(self.evaluation_file):
+            return dict(EMPTY_SUMMARY)
+
+        df = pd.read_csv(self.evaluation_file)
+
+        return {
+            'total_evaluations': len(df),
+            'template_compliance_rate': df['e1_template_compliance_rate'].mean() * 100 if 'e1_template_compliance_rate' in df.columns else 0,
+            'violation_reduction_rate': df['e2_violation_reduction_rate'].mean() * 100 if 'e2_violation_reduction_rate' in df.columns else 0,
+            'gap_resolution_rate': df['h9_pass'].mean() * 100 if 'h9_pass' in df.columns else 0,
+            'overall_pass_rate': df['overall_pass'].mean() * 100 if 'overall_pass' in df.columns else 0,
+            'avg_template_score': df['e1_template_score'].mean() if 'e1_template_score' in df.columns else 0,
+            'avg_style_score': df['e2_style_score'].mean() if 'e2_style_score' in df.columns else 0,
+            'avg_overall_score': df['overall_score'].mean() if 'overall_score' in df.columns else 0
+        }
+
+
+def evaluation_backend(backend: Optional[str] = None) -> str:
+    """The backend name to use: `backend` if given, else DOCUALIGN_EVALUATION_BACKEND (default sqlite)"""
+    return (backend or os.getenv("DOCUALIGN_EVALUATION_BACKEND", "sqlite")).lower()
+
+
+def create_evaluation_store(backend: Optional[str] = None):
+    """Create the evaluation store selected by DOCUALIGN_EVALUATION_BACKEND (sqlite, parquet or csv)"""
+    backend = evaluation_backend(backend)
+    if backend == "csv":
+        return CSVEvaluationStore()
+    if backend == "sqlite":
+        return EvaluationStore()
+    if backend == "parquet":
+        from components.evaluation.columnar import ColumnarEvaluationStore
+        return ColumnarEvaluationStore()
+    raise ValueError(f"Unknown evaluation backend: {backend}")
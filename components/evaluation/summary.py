@@ -0,0 +1,73 @@
+import os
+import sqlite3
+from typing import Dict, Any, Optional
+
+# Kept free of pandas so pages that only show totals (the sidebar) start fast
+
+EVALUATIONS_DB = "components/data/evaluations.db"
+
+EMPTY_SUMMARY = {
+    'total_evaluations': 0,
+    'template_compliance_rate': 0,
+    'violation_reduction_rate': 0,
+    'gap_resolution_rate': 0,
+    'overall_pass_rate': 0,
+    'avg_template_score': 0,
+    'avg_style_score': 0,
+    'avg_overall_score': 0,
+    'template_pass_rate': 0,
+    'style_pass_rate': 0
+}
+
+# Running aggregates kept per metric: summary key -> (column, scale)
+AGGREGATE_METRICS = {
+    'template_compliance_rate': ('e1_template_compliance_rate', 100),
+    'violation_reduction_rate': ('e2_violation_reduction_rate', 100),
+    'gap_resolution_rate': ('h9_pass', 100),
+    'overall_pass_rate': ('overall_pass', 100),
+    'template_pass_rate': ('e1_template_pass', 100),
+    'style_pass_rate': ('e2_style_pass', 100),
+    'avg_template_score': ('e1_template_score', 1),
+    'avg_style_score': ('e2_style_score', 1),
+    'avg_overall_score': ('overall_score', 1)
+}
+
+
+def read_summary(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Summary statistics from the SQLite store's running aggregates"""
+    aggregates = {metric: (count, total) for metric, count, total in
+                  conn.execute("SELECT metric, count, total FROM evaluation_aggregates")}
+    missing_element_counts = dict(conn.execute(
+        "SELECT element, missing_count FROM evaluation_element_totals ORDER BY missing_count DESC"
+    ).fetchall())
+    violation_totals = dict(conn.execute(
+        "SELECT violation_type, total FROM evaluation_violation_totals ORDER BY total DESC"
+    ).fetchall())
+
+    summary = dict(EMPTY_SUMMARY)
+    summary['total_evaluations'] = aggregates.get('evaluations', (0, 0))[0]
+    for key, (column, scale) in AGGREGATE_METRICS.items():
+        count, total = aggregates.get(column, (0, 0))
+        if count:
+            summary[key] = total / count * scale
+    summary['missing_element_counts'] = missing_element_counts
+    summary['violation_totals'] = violation_totals
+    return summary
+
+
+def quick_summary(db_path: str = EVALUATIONS_DB) -> Optional[Dict[str, Any]]:
+    """
+    The SQLite store's summary without loading the store (or pandas). None when
+    another backend is selected or the database is not set up yet; callers then
+    fall back to the full dashboard data.
+    """
+    if os.getenv("DOCUALIGN_EVALUATION_BACKEND", "sqlite").lower() != "sqlite" or not os.path.exists(db_path):
+        return None
+    try:
+        conn = sqlite3.connect(db_path, timeout=30)
+        try:
+            return read_summary(conn)
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
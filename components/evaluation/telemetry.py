@@ -0,0 +1,148 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+import pandas as pd
+
+# Pipeline phases a run records, in order
+PHASES = ['analyzer', 'enforcer', 'evaluation', 'persistence']
+
+# Column name -> SQLite type for one phase of one run
+TELEMETRY_COLUMNS = {
+    'run_id': 'TEXT NOT NULL',
+    'phase': 'TEXT NOT NULL',
+    'timestamp': 'TEXT NOT NULL',
+    'agent': 'TEXT',
+    'model': 'TEXT',
+    'prompt_version': 'TEXT',  # hash of the agent's instructions, so prompt edits split the stats
+    'seconds': 'REAL',
+    'queue_seconds': 'REAL',  # waiting for a scoring worker or the write-behind writer
+    'tokens_in': 'INTEGER',
+    'tokens_out': 'INTEGER',
+    'cached_tokens': 'INTEGER',  # input tokens served from the provider's prompt cache
+    'retries': 'INTEGER',
+    'ok': 'INTEGER'
+}
+
+TELEMETRY_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS run_telemetry (
+    {', '.join(f'{name} {sql_type}' for name, sql_type in TELEMETRY_COLUMNS.items())},
+    PRIMARY KEY (run_id, phase)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_run_telemetry_timestamp ON run_telemetry(timestamp);
+"""
+
+# Database paths whose schema has already been created by this process
+_INITIALIZED_TELEMETRY = set()
+
+
+def phase_latencies(records: pd.DataFrame, percentiles=(50, 90, 99)) -> pd.DataFrame:
+    """Runs and latency / queue wait percentiles (seconds) per phase"""
+    rows = []
+    for phase in PHASES:
+        phase_records = records[records['phase'] == phase]
+        if phase_records.empty:
+            continue
+        row = {'phase': phase, 'runs': len(phase_records)}
+        for p in percentiles:
+            row[f'p{p}'] = phase_records['seconds'].quantile(p / 100, interpolation='higher')
+        queue_seconds = phase_records['queue_seconds'].dropna()
+        row['queue_p50'] = queue_seconds.quantile(0.5, interpolation='higher') if len(queue_seconds) else None
+        row['queue_p90'] = queue_seconds.quantile(0.9, interpolation='higher') if len(queue_seconds) else None
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def agent_usage(records: pd.DataFrame) -> pd.DataFrame:
+    """Calls, tokens, prompt cache hit rate, retries and failures per agent, model and prompt version"""
+    calls = records[records['agent'].notna()]
+    if calls.empty:
+        return pd.DataFrame()
+    usage = calls.groupby(['agent', 'model', 'prompt_version'], dropna=False).agg(
+        calls=('run_id', 'size'), first_seen=('timestamp', 'min'), p50_seconds=('seconds', 'median'),
+        avg_tokens_in=('tokens_in', 'mean'), avg_tokens_out=('tokens_out', 'mean'),
+        tokens_in=('tokens_in', 'sum'), cached_tokens=('cached_tokens', 'sum'),
+        retries=('retries', 'sum'), failures=('ok', lambda ok: int((~ok).sum()))
+    ).reset_index()
+    usage['cache_hit_rate'] = (usage['cached_tokens'] / usage['tokens_in'].where(usage['tokens_in'] > 0) * 100).fillna(0)
+    return usage.sort_values(['agent', 'first_seen'], ignore_index=True)
+
+
+def telemetry_trend(records: pd.DataFrame, freq: str) -> pd.DataFrame:
+    """Per time bucket: median seconds per phase plus completed runs (throughput)"""
+    buckets = records['timestamp'].dt.floor(freq).rename('bucket')
+    latency = records.pivot_table(index=buckets, columns='phase', values='seconds', aggfunc='median')
+    runs = records[records['phase'] == 'evaluation'].groupby(buckets).size().rename('runs')
+    return latency.join(runs, how='outer').fillna({'runs': 0}).reset_index()
+
+
+def phase_estimates(records: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+    """Median seconds and output tokens of each phase's successful runs, for progress ETAs"""
+    estimates = {}
+    for phase, group in records[records['ok']].groupby('phase'):
+        tokens_out = group['tokens_out'].median()
+        estimates[phase] = {
+            'seconds': float(group['seconds'].median()),
+            'tokens_out': None if pd.isna(tokens_out) else float(tokens_out)
+        }
+    return estimates
+
+
+class TelemetryStore:
+    """
+    Per-run performance records: one row per pipeline phase with its latency,
+    queue wait, token usage and retries. Lives in its own SQLite file, like the
+    run archive, so telemetry writes never contend with the evaluation store.
+    """
+
+    def __init__(self, db_path: str = "components/data/telemetry.db"):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        if os.path.abspath(db_path) not in _INITIALIZED_TELEMETRY:
+            with self._connect() as conn:
+                conn.executescript(TELEMETRY_SCHEMA)
+            _INITIALIZED_TELEMETRY.add(os.path.abspath(db_path))
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def save_many(self, records: List[Dict[str, Any]]):
+        """Save phase records; saving a run's phase again replaces it, so replays are harmless"""
+        columns = list(TELEMETRY_COLUMNS)
+        with self._connect() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO run_telemetry ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})",
+                [[record.get(column) for column in columns] for record in records]
+            )
+
+    def records(self, since: Optional[datetime] = None) -> pd.DataFrame:
+        """Phase records since a time (all when None), oldest first"""
+        sql = f"SELECT {', '.join(TELEMETRY_COLUMNS)} FROM run_telemetry"
+        params = []
+        if since is not None:
+            sql += " WHERE timestamp >= ?"
+            params.append(since.isoformat())
+        with self._connect() as conn:
+            df = pd.read_sql_query(sql + " ORDER BY timestamp", conn, params=params)
+        for column, sql_type in TELEMETRY_COLUMNS.items():
+            if sql_type in ('INTEGER', 'REAL') and column != 'ok':
+                df[column] = pd.to_numeric(df[column], errors='coerce')
+        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+        df['ok'] = df['ok'].fillna(1).astype(bool)
+        return df
+
+    def version(self) -> tuple:
+        """Record count and newest timestamp; changes whenever a run is recorded"""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*), MAX(timestamp) FROM run_telemetry").fetchone()
@@ -0,0 +1,116 @@
+"""
+Cold-start benchmark for the Streamlit entry point. Each run starts a fresh
+interpreter, renders the main page once with Streamlit's AppTest and records
+how long the script took and which modules it loaded. New server processes and
+autoscaled replicas pay this before their first page paint.
+
+    python -m components.import_budget --runs 5 --top 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, Any, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_SCRIPT = os.path.join(ROOT, 'documentation_app.py')
+
+# Seconds the first run of the main page may take in a fresh process, on top of
+# importing Streamlit itself (about 0.4s). Measured at about 0.25s; it was 1.5s
+# while the evaluator, dashboard and OpenAI SDK were imported up front.
+COLD_START_BUDGET_SECONDS = 0.5
+
+# Modules only the dashboard, the agents or an upload worker need; loading the
+# main page must not import them
+DEFERRED_MODULES = ['pandas', 'numpy', 'pyarrow', 'plotly.express', 'openai', 'pypdf']
+
+IMPORT_MARKER = 'docualign-import-budget'
+
+# Runs in the child process: argv is the app script, then the deferred modules
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+framework = time.perf_counter() - started
+sys.stderr.write('%s\\n')
+sys.stderr.flush()
+started = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=60).run()
+print(json.dumps({
+    'framework': framework,
+    'first_run': time.perf_counter() - started,
+    'errors': [str(e.value) for e in at.exception],
+    'loaded': [name for name in sys.argv[2:] if name in sys.modules]
+}))
+""" % IMPORT_MARKER
+
+
+def measure(import_time: bool = False) -> Dict[str, Any]:
+    """Render the main page once in a fresh interpreter"""
+    env = dict(os.environ)
+    # Without a key the page stops before the sidebar; the agents never run here
+    env.setdefault('OPENAI_API_KEY', 'import-budget')
+    command = [sys.executable] + (['-X', 'importtime'] if import_time else [])
+    result = subprocess.run(
+        command + ['-c', PROBE, APP_SCRIPT] + DEFERRED_MODULES,
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=300
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Probe failed:\n{result.stderr[-2000:]}")
+    run = json.loads(result.stdout.strip().splitlines()[-1])
+    if import_time:
+        run['imports'] = slowest_imports(result.stderr)
+    return run
+
+
+def slowest_imports(stderr: str) -> List[tuple]:
+    """(seconds, module) for top-level imports made while the page ran, slowest first"""
+    imports = []
+    lines = stderr.splitlines()
+    if IMPORT_MARKER in lines:
+        lines = lines[lines.index(IMPORT_MARKER) + 1:]
+    for line in lines:
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit() and not name.startswith('  ', 1):
+            imports.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(imports, reverse=True)
+
+
+def main(argv: List[str] = None) -> int:
+    """Measure cold starts; exit non-zero when over budget or a deferred module was imported"""
+    parser = argparse.ArgumentParser(description="Measure the DocuAlign app's cold-start import time")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes to time")
+    parser.add_argument("--budget", type=float, default=COLD_START_BUDGET_SECONDS,
+                        help="Seconds the median first run may take")
+    parser.add_argument("--top", type=int, default=0, help="List the N slowest imports of the last run")
+    args = parser.parse_args(argv)
+
+    runs = [measure(import_time=args.top > 0 and index == args.runs - 1) for index in range(args.runs)]
+    first_run = statistics.median(run['first_run'] for run in runs)
+    framework = statistics.median(run['framework'] for run in runs)
+    print(f"Main page cold start: {first_run:.2f}s median over {len(runs)} run(s) "
+          f"(budget {args.budget:.2f}s), plus {framework:.2f}s importing Streamlit")
+    for seconds, name in runs[-1].get('imports', [])[:args.top]:
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+    failed = False
+    errors = runs[-1]['errors']
+    if errors:
+        print(f"The page raised: {errors}")
+        failed = True
+    loaded = sorted({name for run in runs for name in run['loaded']})
+    if loaded:
+        print(f"Deferred modules imported at startup: {', '.join(loaded)}")
+        failed = True
+    if first_run > args.budget:
+        print(f"Cold start over budget by {first_run - args.budget:.2f}s")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,376 @@
+import codecs
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from typing import Dict, Any, Optional
+from xml.etree import ElementTree as ET
+
+# Largest upload accepted, in bytes
+MAX_UPLOAD_BYTES = int(os.getenv("DOCUALIGN_MAX_UPLOAD_BYTES", 20 * 1024 * 1024))
+
+# Largest uncompressed document.xml a .docx may contain (guards against zip bombs)
+MAX_DOCX_XML_BYTES = int(os.getenv("DOCUALIGN_MAX_DOCX_XML_BYTES", 100 * 1024 * 1024))
+
+# Characters of text kept from one upload; the rest is dropped and the result marked truncated
+MAX_INGEST_CHARS = int(os.getenv("DOCUALIGN_MAX_INGEST_CHARS", 2_000_000))
+
+# Seconds the worker process may take before it is stopped
+INGEST_TIMEOUT = float(os.getenv("DOCUALIGN_INGEST_TIMEOUT", 30))
+
+# Bytes copied or decoded at a time
+CHUNK_BYTES = 1024 * 1024
+
+TEXT_SUFFIXES = ('.txt', '.md')
+
+# Byte order marks, longest first so UTF-32 is not taken for UTF-16
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'), (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'), (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16')
+]
+
+# Tried in order when a text file has no BOM; latin-1 decodes any bytes
+FALLBACK_ENCODINGS = ['utf-8', 'cp1252', 'latin-1']
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+HEADING_STYLE = re.compile(r'^heading\s?(\d)$', re.IGNORECASE)
+
+
+class IngestionError(Exception):
+    """An upload that cannot be turned into text; the message is shown to the user"""
+
+
+class _LimitedReader:
+    """
+    A zip member stream that raises IngestionError once more than `limit` bytes
+    were decompressed, whatever size the archive declares for the member
+    """
+
+    def __init__(self, stream, limit: int):
+        self._stream = stream
+        self._limit = limit
+        self._read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        # Never ask for more than one byte past the limit, so a bomb is not
+        # expanded in full before the check
+        allowed = self._limit - self._read + 1
+        try:
+            data = self._stream.read(allowed if size is None or size < 0 else min(size, allowed))
+        except zipfile.BadZipFile:
+            # e.g. a CRC mismatch once a member runs past its declared size
+            raise IngestionError("The .docx file is damaged or not a Word document.")
+        self._read += len(data)
+        if self._read > self._limit:
+            raise IngestionError("The .docx file expands to more content than can be processed.")
+        return data
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stream.close()
+
+
+def _open_docx_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo) -> _LimitedReader:
+    """Open a .docx XML part, checking both its declared and its actual size"""
+    if info.file_size > MAX_DOCX_XML_BYTES:
+        raise IngestionError("The .docx file expands to more content than can be processed.")
+    return _LimitedReader(archive.open(info), MAX_DOCX_XML_BYTES)
+
+
+class _TextSink:
+    """Collects output lines up to a character budget"""
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.chars = 0
+        self.lines = []
+        self.truncated = False
+
+    def add(self, line: str) -> bool:
+        """Append a line; False once the budget is spent"""
+        if self.truncated:
+            return False
+        if self.chars + len(line) > self.max_chars:
+            self.lines.append(line[:self.max_chars - self.chars])
+            self.truncated = True
+            return False
+        self.lines.append(line)
+        self.chars += len(line) + 1
+        return True
+
+    def text(self) -> str:
+        return '\n'.join(self.lines).strip()
+
+
+def sniff_encoding(head: bytes) -> Optional[str]:
+    """Encoding given by a byte order mark or a UTF-16 NUL pattern, else None"""
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+    sample = head[:4096]
+    if len(sample) >= 4 and sample.count(0) * 3 >= len(sample):
+        # Mostly-ASCII UTF-16 without a BOM has a NUL in every other byte
+        return 'utf-16-le' if sample[1::2].count(0) > sample[0::2].count(0) else 'utf-16-be'
+    return None
+
+
+def _decode_text(path: str, max_chars: int) -> Dict[str, Any]:
+    with open(path, 'rb') as f:
+        sniffed = sniff_encoding(f.read(4096))
+    for encoding in ([sniffed] if sniffed else FALLBACK_ENCODINGS):
+        decoder = codecs.getincrementaldecoder(encoding)()
+        parts = []
+        chars = 0
+        try:
+            with open(path, 'rb') as f:
+                while chars <= max_chars:
+                    chunk = f.read(CHUNK_BYTES)
+                    part = decoder.decode(chunk, final=not chunk)
+                    parts.append(part)
+                    chars += len(part)
+                    if not chunk:
+                        break
+        except UnicodeDecodeError:
+            continue
+        text = ''.join(parts).replace('\r\n', '\n').replace('\r', '\n')
+        return {'text': text[:max_chars], 'encoding': encoding, 'truncated': len(text) > max_chars}
+    raise IngestionError("Unable to decode the file as text.")
+
+
+def _docx_numbering(archive: zipfile.ZipFile) -> Dict[tuple, str]:
+    """(numId, ilvl) -> list format ('bullet', 'decimal', ...) from word/numbering.xml"""
+    try:
+        info = archive.getinfo('word/numbering.xml')
+    except KeyError:
+        return {}
+    with _open_docx_member(archive, info) as part:
+        root = ET.parse(part).getroot()
+    abstract_formats = {}
+    for abstract in root.iter(f'{W}abstractNum'):
+        for level in abstract.iter(f'{W}lvl'):
+            fmt = level.find(f'{W}numFmt')
+            abstract_formats[(abstract.get(f'{W}abstractNumId'), level.get(f'{W}ilvl'))] = (
+                fmt.get(f'{W}val') if fmt is not None else 'decimal'
+            )
+    formats = {}
+    for num in root.iter(f'{W}num'):
+        abstract_id = num.find(f'{W}abstractNumId')
+        if abstract_id is None:
+            continue
+        for (abstract, level), fmt in abstract_formats.items():
+            if abstract == abstract_id.get(f'{W}val'):
+                formats[(num.get(f'{W}numId'), level)] = fmt
+    return formats
+
+
+def _paragraph_text(paragraph) -> str:
+    parts = []
+    for node in paragraph.iter():
+        if node.tag == f'{W}t' and node.text:
+            parts.append(node.text)
+        elif node.tag == f'{W}tab':
+            parts.append('\t')
+        elif node.tag in (f'{W}br', f'{W}cr'):
+            parts.append('\n')
+    return ''.join(parts)
+
+
+def _paragraph_line(paragraph, text: str, numbering: Dict[tuple, str], state: Dict[str, Any]) -> str:
+    """
+    One body paragraph as Markdown: title and headings as '#', list items as
+    '1.' or '-'. Once a Title paragraph is seen, Heading 1 becomes '##'.
+    """
+    properties = paragraph.find(f'{W}pPr')
+    if properties is None:
+        return text
+    style = properties.find(f'{W}pStyle')
+    style_id = style.get(f'{W}val', '') if style is not None else ''
+    heading = HEADING_STYLE.match(style_id)
+    if style_id.lower() == 'title':
+        state['title_seen'] = True
+        return f"# {text}"
+    if heading:
+        level = max(int(heading.group(1)), 1) + (1 if state['title_seen'] else 0)
+        return f"{'#' * min(level, 6)} {text}"
+    number = properties.find(f'{W}numPr')
+    if number is None:
+        return text
+    level_node = number.find(f'{W}ilvl')
+    num_node = number.find(f'{W}numId')
+    level = int(level_node.get(f'{W}val', '0')) if level_node is not None else 0
+    num_id = num_node.get(f'{W}val') if num_node is not None else None
+    # An item restarts the numbering of the levels below it
+    counters = state['list_counters']
+    for key in [key for key in counters if key[0] == num_id and key[1] > level]:
+        del counters[key]
+    counters[(num_id, level)] = counters.get((num_id, level), 0) + 1
+    fmt = numbering.get((num_id, str(level)), 'decimal')
+    marker = '-' if fmt in ('bullet', 'none') else f"{counters[(num_id, level)]}."
+    return f"{'   ' * level}{marker} {text}"
+
+
+def _extract_docx(path: str, max_chars: int) -> Dict[str, Any]:
+    """Stream paragraphs out of word/document.xml as Markdown: headings, lists and tables"""
+    try:
+        archive = zipfile.ZipFile(path)
+    except zipfile.BadZipFile:
+        raise IngestionError("The .docx file is damaged or not a Word document.")
+    with archive:
+        try:
+            info = archive.getinfo('word/document.xml')
+        except KeyError:
+            raise IngestionError("The .docx file has no document body.")
+        numbering = _docx_numbering(archive)
+        state = {'title_seen': False, 'list_counters': {}}
+        sink = _TextSink(max_chars)
+        body = None
+        table_depth = 0
+        rows_in_table = 0
+        row = []
+        cell = []
+
+        with _open_docx_member(archive, info) as document:
+            for event, element in ET.iterparse(document, events=('start', 'end')):
+                tag = element.tag
+                if event == 'start':
+                    if tag == f'{W}body':
+                        body = element
+                    elif tag == f'{W}tbl':
+                        table_depth += 1
+                        if table_depth == 1:
+                            rows_in_table = 0
+                    elif tag == f'{W}tr' and table_depth == 1:
+                        row = []
+                    elif tag == f'{W}tc' and table_depth == 1:
+                        cell = []
+                    continue
+
+                if tag == f'{W}p':
+                    text = _paragraph_text(element).strip()
+                    if table_depth:
+                        if text:
+                            cell.append(text.replace('\n', ' ').replace('|', '\\|'))
+                        continue
+                    line = _paragraph_line(element, text, numbering, state) if text else ''
+                    # Processed paragraphs are dropped so memory stays flat on long documents
+                    body.clear()
+                    if not sink.add(line):
+                        break
+                elif tag == f'{W}tc' and table_depth == 1:
+                    row.append(' '.join(cell))
+                elif tag == f'{W}tr' and table_depth == 1:
+                    if not sink.add(f"| {' | '.join(row)} |"):
+                        break
+                    if rows_in_table == 0:
+                        sink.add(f"|{'---|' * len(row)}")
+                    rows_in_table += 1
+                elif tag == f'{W}tbl':
+                    table_depth -= 1
+                    if not table_depth:
+                        sink.add('')
+                        body.clear()
+    return {'text': sink.text(), 'encoding': None, 'truncated': sink.truncated}
+
+
+def _extract_pdf(path: str, max_chars: int) -> Dict[str, Any]:
+    """Page text in reading order; pages are separated by blank lines"""
+    # Imported in the worker only; optional, so .pdf uploads are rejected with a hint
+    try:
+        import pypdf
+    except ImportError:
+        raise IngestionError("Reading .pdf files requires the optional pypdf package.")
+    try:
+        reader = pypdf.PdfReader(path)
+        if reader.is_encrypted and not reader.decrypt(''):
+            raise IngestionError("The PDF is password-protected.")
+        sink = _TextSink(max_chars)
+        for page in reader.pages:
+            text = (page.extract_text() or '').strip()
+            if text and not sink.add(text + '\n'):
+                break
+    except pypdf.errors.PdfReadError as e:
+        raise IngestionError(f"The PDF could not be read: {e}")
+    text = sink.text()
+    if not text:
+        raise IngestionError("No text found in the PDF. Scanned pages need OCR before upload.")
+    return {'text': text, 'encoding': None, 'truncated': sink.truncated}
+
+
+def extract_text(path: str, suffix: str, max_chars: int = MAX_INGEST_CHARS) -> Dict[str, Any]:
+    """text, encoding (text files only) and truncated flag for one file on disk"""
+    suffix = suffix.lower()
+    if suffix == '.docx':
+        return _extract_docx(path, max_chars)
+    if suffix == '.pdf':
+        return _extract_pdf(path, max_chars)
+    if suffix in TEXT_SUFFIXES:
+        return _decode_text(path, max_chars)
+    raise IngestionError(f"Unsupported file type: {suffix or 'unknown'}")
+
+
+def _worker(connection, path: str, suffix: str, max_chars: int):
+    """Worker process entry point: send ('ok', result) or ('error', message) back"""
+    try:
+        result = ('ok', extract_text(path, suffix, max_chars))
+    except IngestionError as e:
+        result = ('error', str(e))
+    except Exception as e:
+        result = ('error', f"Unable to read the file: {e}")
+    try:
+        connection.send(result)
+    except BrokenPipeError:
+        pass  # the app stopped waiting
+    finally:
+        connection.close()
+
+
+def ingest_upload(uploaded_file, max_bytes: int = MAX_UPLOAD_BYTES, max_chars: int = MAX_INGEST_CHARS,
+                  timeout: float = INGEST_TIMEOUT) -> Dict[str, Any]:
+    """
+    Text of an uploaded file, extracted in a separate process. The upload is
+    copied to a temporary file in chunks and the worker streams it from there,
+    so parsing memory and CPU never land in the Streamlit process. A worker
+    that runs past `timeout` seconds is stopped. Raises IngestionError.
+    """
+    size = getattr(uploaded_file, 'size', None)
+    if size is not None and size > max_bytes:
+        raise IngestionError(f"The file is {size / 1024 / 1024:.1f} MB; the limit is {max_bytes / 1024 / 1024:.1f} MB.")
+    suffix = os.path.splitext(uploaded_file.name)[1].lower()
+
+    directory = tempfile.mkdtemp(prefix='docualign-upload-')
+    try:
+        path = os.path.join(directory, 'upload' + suffix)
+        uploaded_file.seek(0)
+        with open(path, 'wb') as f:
+            shutil.copyfileobj(uploaded_file, f, CHUNK_BYTES)
+
+        # spawn: forking the threaded Streamlit server is unsafe
+        context = multiprocessing.get_context('spawn')
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=_worker, args=(sender, path, suffix, max_chars), daemon=True)
+        process.start()
+        sender.close()
+        try:
+            if not receiver.poll(timeout):
+                raise IngestionError(f"Reading the file took longer than {timeout:.0f} seconds.")
+            status, payload = receiver.recv()
+        except EOFError:
+            raise IngestionError("The file reader stopped unexpectedly.")
+        finally:
+            receiver.close()
+            process.join(1)
+            if process.is_alive():
+                process.kill()
+                process.join()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    if status == 'error':
+        raise IngestionError(payload)
+    payload['format'] = suffix.lstrip('.')
+    return payload
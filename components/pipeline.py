@@ -0,0 +1,198 @@
+import asyncio
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+from xml.etree import ElementTree as ET
+
+# Pipelines run here so the Streamlit script thread only polls their progress
+PIPELINE_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="pipeline")
+
+# The analyzer starts its reply with this when the input is not a how-to guide
+TYPE_MISMATCH_MARKER = "⚠️ DOCUMENT TYPE MISMATCH"
+
+# Agent phases a job runs, in order; scoring then continues on the evaluator's executor
+PIPELINE_PHASES = ['analyzer', 'enforcer']
+
+# Expected phase length until telemetry has been recorded
+DEFAULT_ESTIMATES = {
+    'analyzer': {'seconds': 60.0, 'tokens_out': None},
+    'enforcer': {'seconds': 45.0, 'tokens_out': None}
+}
+
+# Days of telemetry the ETA is estimated from
+ESTIMATE_DAYS = 7
+
+
+def parse_analyzer_output(output: str) -> dict:
+    """
+    Parse the three sections from Document Analyzer output:
+    - Structure Analysis
+    - Redlined Version
+    - Clean Draft
+    """
+    sections = {
+        'structure_analysis': '',
+        'redlined_version': '',
+        'clean_draft': ''
+    }
+
+    # Extract Structure Analysis section
+    analysis_match = re.search(
+        r'## 📊 Structure Analysis.*?(?=## 🔴 REDLINED VERSION|$)',
+        output,
+        re.DOTALL
+    )
+    if analysis_match:
+        sections['structure_analysis'] = analysis_match.group(0).strip()
+
+    # Extract Redlined Version section
+    redline_match = re.search(
+        r'## 🔴 REDLINED VERSION.*?(?=## ✨ CLEAN DRAFT|$)',
+        output,
+        re.DOTALL
+    )
+    if redline_match:
+        sections['redlined_version'] = redline_match.group(0).strip()
+
+    # Extract Clean Draft section
+    draft_match = re.search(
+        r'## ✨ CLEAN DRAFT.*?(?=$)',
+        output,
+        re.DOTALL
+    )
+    if draft_match:
+        # Remove the header and handoff note
+        draft_text = draft_match.group(0).strip()
+        # Remove "HANDOFF NOTE FOR STYLE ENFORCER" section
+        draft_text = re.sub(r'\*\*HANDOFF NOTE.*?---', '', draft_text, flags=re.DOTALL)
+        sections['clean_draft'] = draft_text.strip()
+
+    return sections
+
+
+def extract_clean_content(text: str) -> str:
+    """Remove XML tags if present"""
+    try:
+        root = ET.fromstring(text)
+        return root.text.strip()
+    except ET.ParseError:
+        return text
+
+
+class PipelineJob:
+    """
+    One analyzer -> enforcer run on a background thread, ending with the
+    evaluation submitted to the scoring executor. The Streamlit script only
+    reads the job's state, so the page stays responsive while agents run.
+    Status moves from 'queued' through each phase to 'done', 'rejected'
+    (not a how-to guide) or 'failed'; outputs are complete once it is final.
+    """
+
+    def __init__(self, runner, analyzer, enforcer, evaluator, content: str, user_id: str = "anonymous"):
+        self.runner = runner
+        self.analyzer = analyzer
+        self.enforcer = enforcer
+        self.evaluator = evaluator
+        self.content = content
+        self.user_id = user_id
+        self.status = 'queued'
+        self.phase_started: Optional[float] = None
+        self.tokens = {phase: 0 for phase in PIPELINE_PHASES}
+        self.estimates = {phase: dict(estimate) for phase, estimate in DEFAULT_ESTIMATES.items()}
+        self.outputs: Dict[str, Any] = {}
+        self.evaluation_future = None
+        self.error: Optional[str] = None
+
+    def start(self) -> "PipelineJob":
+        PIPELINE_EXECUTOR.submit(self._run)
+        return self
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('done', 'rejected', 'failed')
+
+    def _load_estimates(self):
+        # Telemetry reads need pandas; imported when a run starts rather than with the app
+        from components.evaluation.telemetry import TelemetryStore, phase_estimates
+        try:
+            records = TelemetryStore().records(since=datetime.now() - timedelta(days=ESTIMATE_DAYS))
+            for phase, estimate in phase_estimates(records).items():
+                if phase in self.estimates:
+                    self.estimates[phase] = estimate
+        except Exception as e:
+            print(f"Error loading phase estimates: {e}")
+
+    def _run_agent(self, phase: str, agent, text: str):
+        """Run one agent phase, streaming so its token count can be shown"""
+        self.phase_started = time.perf_counter()
+        self.status = phase
+
+        def on_progress(chunks: int):
+            self.tokens[phase] = chunks
+
+        return asyncio.run(self.runner.run(agent, text, on_progress=on_progress))
+
+    def _run(self):
+        try:
+            self._load_estimates()
+            analysis_result = self._run_agent('analyzer', self.analyzer, self.content)
+            telemetry = [dict(analysis_result.telemetry, phase='analyzer')]
+            if TYPE_MISMATCH_MARKER in analysis_result.final_output:
+                self.outputs['rejection_message'] = analysis_result.final_output
+                self.status = 'rejected'
+                return
+            self.outputs.update(parse_analyzer_output(analysis_result.final_output))
+
+            enforced_result = self._run_agent('enforcer', self.enforcer, self.outputs['clean_draft'])
+            telemetry.append(dict(enforced_result.telemetry, phase='enforcer'))
+            # Extract clean content from XML if present
+            self.outputs['final_document'] = extract_clean_content(enforced_result.final_output)
+
+            # Quality evaluation runs in the background; the Quality Report tab fills in when done
+            self.evaluation_future = self.evaluator.submit_evaluation(
+                original_content=self.content,
+                analysis_report=self.outputs['structure_analysis'],
+                final_output=self.outputs['final_document'],
+                user_id=self.user_id,
+                redlined_version=self.outputs['redlined_version'],
+                clean_draft=self.outputs['clean_draft'],
+                timings={
+                    'analysis_seconds': analysis_result.telemetry.get('seconds'),
+                    'style_seconds': enforced_result.telemetry.get('seconds')
+                },
+                telemetry=telemetry
+            )
+            self.status = 'done'
+        except Exception as e:
+            self.error = str(e)
+            self.status = 'failed'
+
+    def progress(self) -> Dict[str, Any]:
+        """
+        Current phase (1-based number and name), overall fraction done, tokens
+        streamed in this phase and estimated seconds left. A phase's remaining
+        time comes from its streaming rate once tokens arrive and the median
+        output length is known, else from its median length.
+        """
+        if self.status not in PIPELINE_PHASES:
+            return {'phase': self.status, 'number': 0, 'fraction': 0.0, 'tokens': 0, 'eta': None}
+        index = PIPELINE_PHASES.index(self.status)
+        estimate = self.estimates[self.status]
+        elapsed = time.perf_counter() - self.phase_started
+        tokens = self.tokens[self.status]
+        if tokens and estimate['tokens_out']:
+            remaining = max(estimate['tokens_out'] - tokens, 0) / (tokens / elapsed)
+            fraction = tokens / estimate['tokens_out']
+        else:
+            remaining = max(estimate['seconds'] - elapsed, 0)
+            fraction = elapsed / estimate['seconds'] if estimate['seconds'] else 0
+        remaining += sum(self.estimates[phase]['seconds'] for phase in PIPELINE_PHASES[index + 1:])
+        return {
+            'phase': self.status,
+            'number': index + 1,
+            'fraction': (index + min(fraction, 0.99)) / len(PIPELINE_PHASES),
+            'tokens': tokens,
+            'eta': remaining
+        }
@@ -0,0 +1,176 @@
+import os
+import shutil
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import streamlit as st
+
+from components.artifacts import ArtifactStore, content_hash
+
+# Bytes of text one session keeps in memory; the rest is read back from disk when shown
+SESSION_CACHE_BYTES = int(os.getenv("DOCUALIGN_SESSION_CACHE_BYTES", 2 * 1024 * 1024))
+
+# Per-session spill directories; removed when the session is reset or ends
+SESSION_SPILL_DIR = "components/data/sessions"
+
+# Spill directories untouched for this many seconds are left over from a
+# process that stopped and are removed by the next session to start
+SESSION_SPILL_TTL = int(os.getenv("DOCUALIGN_SESSION_SPILL_TTL", 24 * 3600))
+
+# Shown in place of a text whose spilled copy is gone
+MISSING_TEXT = "⚠️ This text is no longer available. Please run the analysis again."
+
+# Spill directories of sessions alive in this process; never removed as stale
+_LIVE_SPILLS = set()
+
+
+def _release_spill(root: str):
+    """Remove a session's spill directory once the session is gone"""
+    _LIVE_SPILLS.discard(os.path.abspath(root))
+    shutil.rmtree(root, ignore_errors=True)
+
+
+def remove_stale_spills(spill_dir: str = SESSION_SPILL_DIR, ttl: float = SESSION_SPILL_TTL) -> int:
+    """
+    Delete spill directories not used within ttl seconds, other than those of
+    this process's live sessions; returns how many were removed
+    """
+    removed = 0
+    cutoff = time.time() - ttl
+    try:
+        entries = list(os.scandir(spill_dir))
+    except OSError:
+        return 0
+    for entry in entries:
+        try:
+            if os.path.abspath(entry.path) in _LIVE_SPILLS:
+                continue
+            if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+class ArtifactHandle:
+    """
+    A session's reference to one text: its content hash and size. Kept in
+    session state instead of the text itself; the hash is the same one the run
+    archive stores the text under.
+    """
+
+    __slots__ = ('digest', 'size')
+
+    def __init__(self, digest: str, size: int):
+        self.digest = digest
+        self.size = size
+
+    def __repr__(self):
+        return f"ArtifactHandle({self.digest[:12]}, {self.size} bytes)"
+
+
+class SessionArtifacts:
+    """
+    One session's texts by handle. The most recently used ones stay in memory up
+    to max_bytes; older ones are spilled to a content-addressed store private to
+    the session and loaded again only when a tab or download needs them. The
+    spill directory is deleted by clear() and when the session is garbage
+    collected. Thread-safe, since deferred downloads read texts off the script
+    thread.
+    """
+
+    def __init__(self, store: Optional[ArtifactStore] = None, max_bytes: int = SESSION_CACHE_BYTES):
+        self._owns_store = store is None
+        self.store = store or ArtifactStore(os.path.join(SESSION_SPILL_DIR, uuid.uuid4().hex))
+        if self._owns_store:
+            # Uploads and drafts must not outlive the session on disk
+            _LIVE_SPILLS.add(os.path.abspath(self.store.root))
+            self._finalizer = weakref.finalize(self, _release_spill, self.store.root)
+        self.max_bytes = max_bytes
+        self.memory_bytes = 0
+        self._texts: "OrderedDict[str, str]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def put(self, text: str) -> ArtifactHandle:
+        """Keep a text for this session and return its handle"""
+        data = text.encode('utf-8')
+        handle = ArtifactHandle(content_hash(data), len(data))
+        with self._lock:
+            if handle.digest in self._texts:
+                self._texts.move_to_end(handle.digest)
+            elif handle.size > self.max_bytes:
+                # Too large to ever stay in memory
+                self._spill(data)
+            else:
+                self._remember(handle.digest, text, handle.size)
+        return handle
+
+    def get(self, handle: Optional[ArtifactHandle]) -> str:
+        """The text behind a handle ('' for None), from memory or disk; MISSING_TEXT if it is gone"""
+        if handle is None:
+            return ''
+        self._touch()
+        with self._lock:
+            if handle.digest in self._texts:
+                self._texts.move_to_end(handle.digest)
+                return self._texts[handle.digest]
+        try:
+            text = self.store.get(handle.digest)
+        except (KeyError, OSError) as e:
+            print(f"Error reading session text: {e}")
+            return MISSING_TEXT
+        if handle.size <= self.max_bytes:
+            with self._lock:
+                if handle.digest not in self._texts:
+                    self._remember(handle.digest, text, handle.size)
+        return text
+
+    def loader(self, handle: Optional[ArtifactHandle]):
+        """A no-argument callable returning the text, for deferred download buttons"""
+        self._touch()
+        return lambda: self.get(handle)
+
+    def clear(self):
+        """Drop every text of this session, from memory and from its spill directory"""
+        with self._lock:
+            self._texts.clear()
+            self._sizes.clear()
+            self.memory_bytes = 0
+            if self._owns_store:
+                shutil.rmtree(self.store.root, ignore_errors=True)
+
+    def _spill(self, data: bytes):
+        self.store.put_bytes(data)
+        self._touch()
+
+    def _touch(self):
+        """Mark the spill directory as in use, for remove_stale_spills in other processes"""
+        if self._owns_store:
+            try:
+                os.utime(self.store.root)
+            except OSError:
+                pass  # nothing spilled since the last clear()
+
+    def _remember(self, digest: str, text: str, size: int):
+        self._texts[digest] = text
+        self._sizes[digest] = size
+        self.memory_bytes += size
+        while self.memory_bytes > self.max_bytes:
+            evicted, evicted_text = self._texts.popitem(last=False)
+            self.memory_bytes -= self._sizes.pop(evicted)
+            if not self.store.exists(evicted):
+                self._spill(evicted_text.encode('utf-8'))
+
+
+def get_session_artifacts() -> SessionArtifacts:
+    """This session's artifact cache, created on first use"""
+    if "artifacts" not in st.session_state:
+        remove_stale_spills()
+        st.session_state["artifacts"] = SessionArtifacts()
+    return st.session_state["artifacts"]
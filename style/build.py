@@ -0,0 +1,212 @@
+"""
+Build the app stylesheet: style/docualign.css is minified, selectors that
+match nothing in the app or the installed Streamlit frontend are removed, and
+the result is written to static/ under a content-hashed name, so browsers can
+cache it indefinitely. Run `python -m style.build` after editing the source.
+"""
+import glob
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import Dict, List, Set
+
+import streamlit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE = os.path.join(ROOT, 'style', 'docualign.css')
+STATIC_DIR = os.path.join(ROOT, 'static')
+MANIFEST = os.path.join(STATIC_DIR, 'docualign.manifest.json')
+BUNDLE_PREFIX = 'docualign.'
+
+# Files searched for the classes and test ids our own markup uses
+APP_SOURCES = ['documentation_app.py', 'components/**/*.py']
+
+# Fonts served from static/fonts/ when the file is present: (family, file, weight range)
+FONT_FACES = [('Inter', 'fonts/InterVariable.woff2', '400 700')]
+
+STRING = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'')
+COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+CLASS_SELECTOR = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+TEST_ID_SELECTOR = re.compile(r'\[data-testid=["\']?([\w-]+)["\']?\]')
+
+
+def minify(css: str) -> str:
+    """Strip comments and whitespace; quoted strings are left as they are"""
+    css = COMMENT.sub('', css)
+    parts = []
+    last = 0
+    for match in STRING.finditer(css):
+        parts.append(_minify_code(css[last:match.start()]))
+        parts.append(match.group(0))
+        last = match.end()
+    parts.append(_minify_code(css[last:]))
+    return ''.join(parts).strip()
+
+
+def _minify_code(code: str) -> str:
+    code = re.sub(r'\s+', ' ', code)
+    code = re.sub(r'\s*([{};,>])\s*', r'\1', code)
+    code = re.sub(r':\s+', ':', code)
+    return code.replace(';}', '}')
+
+
+def _split_blocks(css: str) -> List[tuple]:
+    """Top-level (prelude, body) pairs of minified CSS"""
+    blocks = []
+    depth = 0
+    start = 0
+    prelude = ''
+    index = 0
+    while index < len(css):
+        char = css[index]
+        if char in '"\'':
+            index = STRING.match(css, index).end()
+            continue
+        if char == '{':
+            if depth == 0:
+                prelude = css[start:index]
+                start = index + 1
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                blocks.append((prelude, css[start:index]))
+                start = index + 1
+        index += 1
+    return blocks
+
+
+def _split_selectors(prelude: str) -> List[str]:
+    """A selector list split on its top-level commas"""
+    selectors = []
+    depth = 0
+    current = ''
+    for char in prelude:
+        depth += char in '(['
+        depth -= char in ')]'
+        if char == ',' and depth == 0:
+            selectors.append(current)
+            current = ''
+        else:
+            current += char
+    selectors.append(current)
+    return selectors
+
+
+def purge(css: str, names: Set[str]) -> str:
+    """Drop selectors naming a class or data-testid not in `names`, then rules and at-rules left empty"""
+    output = []
+    for prelude, body in _split_blocks(css):
+        if prelude.startswith(('@media', '@supports')):
+            inner = purge(body, names)
+            if inner:
+                output.append(f"{prelude}{{{inner}}}")
+        elif prelude.startswith('@'):
+            output.append(f"{prelude}{{{body}}}")
+        else:
+            kept = [
+                selector for selector in _split_selectors(prelude)
+                if all(name in names for name in CLASS_SELECTOR.findall(STRING.sub('', selector)))
+                and all(test_id in names for test_id in TEST_ID_SELECTOR.findall(selector))
+            ]
+            if kept:
+                output.append(f"{','.join(kept)}{{{body}}}")
+    return ''.join(output)
+
+
+def used_names() -> Set[str]:
+    """Words that can name a class or test id on the page: from our sources and Streamlit's frontend"""
+    texts = []
+    for pattern in APP_SOURCES:
+        for path in glob.glob(os.path.join(ROOT, pattern), recursive=True):
+            with open(path, encoding='utf-8') as f:
+                texts.append(f.read())
+    frontend = os.path.join(os.path.dirname(streamlit.__file__), 'static')
+    for path in glob.glob(os.path.join(frontend, '**', '*.js'), recursive=True):
+        with open(path, encoding='utf-8', errors='ignore') as f:
+            texts.append(f.read())
+    names = set()
+    for text in texts:
+        names.update(re.findall(r'[\w-]+', text))
+    return names
+
+
+def font_faces() -> str:
+    """@font-face rules for the bundled font files that exist"""
+    rules = []
+    for family, path, weight in FONT_FACES:
+        if os.path.exists(os.path.join(STATIC_DIR, path)):
+            rules.append(
+                f'@font-face{{font-family:"{family}";font-style:normal;font-weight:{weight};'
+                f'font-display:swap;src:local("{family}"),url("{path}") format("woff2")}}'
+            )
+    return ''.join(rules)
+
+
+def source_digest() -> str:
+    """Hash of everything a bundle is built from"""
+    digest = hashlib.sha256()
+    with open(SOURCE, 'rb') as f:
+        digest.update(f.read())
+    digest.update(streamlit.__version__.encode('utf-8'))
+    for _, path, _ in FONT_FACES:
+        digest.update(f"{path}:{os.path.exists(os.path.join(STATIC_DIR, path))}".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def build_css() -> str:
+    with open(SOURCE, encoding='utf-8') as f:
+        css = minify(f.read())
+    return font_faces() + purge(css, used_names())
+
+
+def _write_atomically(path: str, text: str):
+    """Write via a temporary file and rename, so readers never see a partial file"""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.chmod(temp_path, 0o644)  # mkstemp creates files readable by the owner only
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def build_bundle() -> Dict[str, str]:
+    """
+    Write static/docualign.<hash>.css and its manifest and return the manifest.
+    Also runs at request time when the bundle is stale, possibly in several
+    server processes at once: files are replaced atomically, and only bundles
+    neither this build nor the manifest on disk refers to are removed.
+    """
+    css = build_css()
+    name = f"{BUNDLE_PREFIX}{hashlib.sha256(css.encode('utf-8')).hexdigest()[:12]}.css"
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    _write_atomically(os.path.join(STATIC_DIR, name), css)
+    manifest = {'bundle': name, 'source': source_digest()}
+    _write_atomically(MANIFEST, json.dumps(manifest, indent=2))
+    keep = {name}
+    try:
+        with open(MANIFEST, encoding='utf-8') as f:
+            keep.add(json.load(f).get('bundle'))
+    except (OSError, ValueError):
+        pass
+    for path in glob.glob(os.path.join(STATIC_DIR, f"{BUNDLE_PREFIX}*.css")):
+        if os.path.basename(path) not in keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # removed by another process meanwhile
+    return manifest
+
+
+if __name__ == '__main__':
+    with open(SOURCE, encoding='utf-8') as f:
+        source_size = len(f.read().encode('utf-8'))
+    manifest = build_bundle()
+    bundle_size = os.path.getsize(os.path.join(STATIC_DIR, manifest['bundle']))
+    print(f"Wrote static/{manifest['bundle']} ({source_size:,} -> {bundle_size:,} bytes)")
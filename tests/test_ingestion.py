@@ -0,0 +1,32 @@
+import io
+import zipfile
+
+import pytest
+
+from components import ingestion
+from components.ingestion import IngestionError, extract_text
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+DOCUMENT = f'<w:document {W}><w:body><w:p><w:r><w:t>Hello</w:t></w:r></w:p></w:body></w:document>'
+
+
+def _docx(path, numbering: str) -> str:
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('word/document.xml', DOCUMENT)
+        archive.writestr('word/numbering.xml', numbering)
+    return str(path)
+
+
+def test_oversized_numbering_part_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion, 'MAX_DOCX_XML_BYTES', 1000)
+    path = _docx(tmp_path / 'bomb.docx', f'<w:numbering {W}><!--{"x" * 50_000}--></w:numbering>')
+    with pytest.raises(IngestionError, match="expands to more content"):
+        extract_text(path, '.docx', 1000)
+
+
+def test_limited_reader_stops_past_the_limit_whatever_the_declared_size():
+    reader = ingestion._LimitedReader(io.BytesIO(b'x' * 100), 10)
+    with pytest.raises(IngestionError):
+        while reader.read(4):
+            pass
+    assert ingestion._LimitedReader(io.BytesIO(b'x' * 10), 10).read() == b'x' * 10
@@ -0,0 +1,22 @@
+from components.artifacts import ArtifactStore
+from components.evaluation.runs import RunArchive
+
+TEXTS = {'original_content': "# Draft", 'analysis_report': "Analysis", 'final_output': "# Final"}
+
+
+def test_saving_a_run_again_keeps_scores_of_every_version(tmp_path):
+    archive = RunArchive(str(tmp_path / "runs.db"), ArtifactStore(str(tmp_path / "artifacts")))
+    archive.save_run('r1', '2026-01-01T00:00:00', 'user', TEXTS)
+    score = {'run_id': 'r1', 'timestamp': '2026-01-01T00:00:00', 'user_id': 'user'}
+    archive.save_scores([
+        dict(score, scoring_version=1, overall_score=3.0),
+        dict(score, scoring_version=2, overall_score=4.0)
+    ])
+
+    # Write-behind replays save the same run again
+    archive.save_run('r1', '2026-01-01T00:00:00', 'user', dict(TEXTS, final_output="# Final, edited"))
+
+    assert archive.scores(1)['overall_score'].tolist() == [3.0]
+    assert archive.scores(2)['overall_score'].tolist() == [4.0]
+    run = archive.pending_runs(3)[0]
+    assert archive.load_texts(run)['final_output'] == "# Final, edited"